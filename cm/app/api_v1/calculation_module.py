@@ -64,6 +64,8 @@ def calculation(output_directory, inputs_raster_selection, inputs_vector_selecti
     inputs_parameter_selection["transmission_line_threshold"] = \
         float(inputs_parameter_selection["transmission_line_threshold"]) * 10  # convert from ct/kWh to euro/MWh
     # inputs_parameter_selection["spatial_resolution"] = float(inputs_parameter_selection["spatial_resolution"])
+    # number of worker processes of the neighbour search. Not part of the user inputs, hence defaults to one process
+    inputs_parameter_selection["number_of_processes"] = int(inputs_parameter_selection.get("number_of_processes", 1))
 
     industrial_database_excess_heat = inputs_vector_selection['industrial_database_excess_heat']
     industrial_database_subsector = inputs_vector_selection['industrial_database_subsector']
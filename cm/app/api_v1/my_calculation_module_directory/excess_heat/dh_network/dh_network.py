@@ -1,9 +1,10 @@
 import numpy as np
 import fiona
 from fiona.crs import from_epsg
+from ..graph.graph import SOURCE_TYPE, SINK_TYPE
 from ..graph.graph_union import NetworkGraphUnion
 from .dh_objects import TransmissionLine, AirLiquidHeatExchanger, LiquidLiquidHeatExchanger, LiquidPump
-from ..utility import find_neighbours, transpose4with1, round_to_n
+from ..utility import find_neighbours, find_neighbours_symmetric, round_to_n
 from ..parameters import *
 
 
@@ -11,8 +12,11 @@ class DHNetwork:
     def __init__(self, heat_sources, heat_sinks, heat_source_profiles, heat_sink_profiles):
         self.heat_sources = heat_sources
         self.heat_sinks = heat_sinks
-        self.heat_source_profiles = heat_source_profiles
-        self.heat_sink_profiles = heat_sink_profiles
+        # read-only copies of the profiles, which lets compute_flow() keep the flows of networks that did not change
+        self.heat_source_profiles = np.array(heat_source_profiles)
+        self.heat_source_profiles.setflags(write=False)
+        self.heat_sink_profiles = np.array(heat_sink_profiles)
+        self.heat_sink_profiles.setflags(write=False)
         self.network = None
         self.time_unit = list(TIME_RESOLUTION_MAP.keys())[0]
         self.country = list(ELECTRICITY_PRICE_MAP.keys())[0]
@@ -21,14 +25,29 @@ class DHNetwork:
         self.discount_rate = 0.03
         self.operational_cost_factor = 0.01
         self.temperature = 100
+        self.neighbour_search_method = "kdtree"
+        self.number_of_processes = 1
+        # use the projected coordinates "X", "Y" in m instead of "Lon", "Lat" for the neighbour search
+        self.projected_coordinates = False
+        # solver of networks with cycles, see MAX_FLOW_BACKEND
+        self.max_flow_backend = MAX_FLOW_BACKEND
+        # solve networks reduced to trees analytically, see TREE_FLOW_SOLVER
+        self.tree_flow_solver = TREE_FLOW_SOLVER
 
     def fixed_radius_search(self, max_distance):
-        source_sink_connections, source_sink_distances = find_neighbours(self.heat_sources, self.heat_sinks,
-                                                                         max_distance)
-        source_source_connections, source_source_distances = find_neighbours(self.heat_sources, self.heat_sources,
-                                                                             max_distance)
-        sink_sink_connections, sink_sink_distances = find_neighbours(self.heat_sinks, self.heat_sinks,
-                                                                     max_distance)
+        # sparse distance matrices, whose entries are the connections as well as the distances
+        source_sink_connections = find_neighbours(self.heat_sources, self.heat_sinks, max_distance,
+                                                  method=self.neighbour_search_method, output="sparse",
+                                                  processes=self.number_of_processes,
+                                                  projected=self.projected_coordinates)
+        source_source_connections = find_neighbours_symmetric(self.heat_sources, max_distance,
+                                                              method=self.neighbour_search_method, output="sparse",
+                                                              processes=self.number_of_processes,
+                                                              projected=self.projected_coordinates)
+        sink_sink_connections = find_neighbours_symmetric(self.heat_sinks, max_distance,
+                                                          method=self.neighbour_search_method, output="sparse",
+                                                          processes=self.number_of_processes,
+                                                          projected=self.projected_coordinates)
         source_correspondence = self.heat_sources["id"].tolist()
         sink_correspondence = self.heat_sinks["id"].tolist()
 
@@ -36,20 +55,22 @@ class DHNetwork:
         # print("source_source_connections: ", len(source_source_connections), " ", self.heat_sources.shape, " ", self.heat_sources.shape)
         # print("sink_sink_connections: ", len(sink_sink_connections), " ", self.heat_sinks.shape, " ", self.heat_sinks.shape)
 
-        edge_attribute = ("distance", source_sink_distances, source_source_distances, sink_sink_distances)
+        edge_attribute = ("distance", source_sink_connections, source_source_connections, sink_sink_connections)
         self.network = NetworkGraphUnion(source_sink_connections, source_source_connections, sink_sink_connections,
                                          source_correspondence, sink_correspondence, edge_attributes=[edge_attribute])
 
     def reduce_to_minimum_spanning_tree(self):
-        self.network.reduce_to_minimum_spanning_tree("distance")
-        self.network.decompose_to_connected()
+        self.network.decompose_to_minimum_spanning_trees("distance")
 
     def compute_flow(self):
-        flows = []
-        for heat_source_capacities, heat_sink_capacities in zip(self.heat_source_profiles, self.heat_sink_profiles):
-            flows.append(self.network.maximum_flow(heat_source_capacities, heat_sink_capacities))
-        flows = transpose4with1(flows)
-        self.flows = flows
+        # all time steps of a network are solved in one call, the networks on number_of_processes processes. Networks
+        # whose lines did not change since the last call keep their flows. The flows are stored with one row per
+        # coherent source, coherent sink or edge and one column per time step.
+        flows = self.network.maximum_flows(self.heat_source_profiles, self.heat_sink_profiles,
+                                           processes=self.number_of_processes, backend=self.max_flow_backend,
+                                           incremental=True, tree_solver=self.tree_flow_solver)
+        self.flows = [[source_flow.T, sink_flow.T, connection_flow.T]
+                      for source_flow, sink_flow, connection_flow in flows]
 
     def heat_used(self, mode="individual"):
         total_flows = []
@@ -156,15 +177,14 @@ class DHNetwork:
         return self.heat_sources["Excess_heat"].sum()
 
     def excess_heat_connected(self, mode="individual"):
+        excess_heat = self.heat_sources["Excess_heat"].values
         excess_heat_connected = []
-        for flows, vertices in zip(self.flows, self.network.vertices()):
+        for flows, vertex_types, vertex_ids in zip(self.flows, self.network.vertex_types(), self.network.vertex_ids()):
             excess_heat_connected.append(0)
             if len(flows[0]) > 0:
                 flows = np.sum(np.abs(flows[0]), axis=1)
-                vertices = list(filter(lambda x: x[0] == "source", vertices))
-                for flow, vertex in zip(flows, vertices):
-                    if flow > 0:
-                        excess_heat_connected[-1] += self.heat_sources.iloc[vertex[1]]["Excess_heat"]
+                sources = vertex_ids[vertex_types == SOURCE_TYPE][:len(flows)]
+                excess_heat_connected[-1] += np.sum(excess_heat[sources[flows[:len(sources)] > 0]])
 
         if mode == "individual":
             return excess_heat_connected
@@ -255,6 +275,7 @@ class DHNetwork:
                                              operational_costs_factor=self.operational_cost_factor)
         highest_specific_costs = [-1]
         edge_to_delete = None
+        edges_to_delete = []
         for network, distances, edges in zip(self.flows, self.network.get_edge_attribute("distance"),
                                              self.network.edge_source_target_vertices()):
 
@@ -268,13 +289,16 @@ class DHNetwork:
                     edge_to_delete = edge
                     highest_specific_costs[-1] = transmission_line.specific_costs()
             if mode == "individual":
-                self.network.delete_edges([edge_to_delete])
+                if edge_to_delete is not None:
+                    edges_to_delete.append(edge_to_delete)
                 highest_specific_costs.append(-1)
                 edge_to_delete = None
 
         # remove last append -1
         if mode == "individual":
             highest_specific_costs.pop()
+            # delete the edges of all networks at once
+            self.network.delete_edges(edges_to_delete)
 
         if mode == "total":
             self.network.delete_edges([edge_to_delete])
@@ -344,16 +368,14 @@ class DHNetwork:
             profiles = self.heat_source_profiles.transpose()
         else:
             profiles = self.heat_sink_profiles.transpose()
+        target_type = SOURCE_TYPE if target == "source" else SINK_TYPE
         heat_profiles = []
-        for flows, vertices in zip(self.flows, self.network.vertices()):
+        for flows, vertex_types, vertex_ids in zip(self.flows, self.network.vertex_types(), self.network.vertex_ids()):
             heat_profiles.append(np.zeros(np.shape(profiles)[1]))
             if len(flows[0]) > 0:
                 flows = np.sum(np.abs(flows[0]), axis=1)
-                vertices = list(filter(lambda x: x[0] == target, vertices))
-
-                for flow, vertex in zip(flows, vertices):
-                    if flow > 0:
-                        heat_profiles[-1] += profiles[vertex[1]]
+                targets = vertex_ids[vertex_types == target_type][:len(flows)]
+                heat_profiles[-1] += np.sum(profiles[targets[flows[:len(targets)] > 0]], axis=0)
         if mode == "individual":
             return heat_profiles
         elif mode == "total":
@@ -0,0 +1,60 @@
+import unittest
+import numpy as np
+import pandas as pd
+from ..dh_network import DHNetwork
+
+
+def random_sites(number_of_sites, random, column):
+    return pd.DataFrame({"Lon": random.uniform(10, 10.3, number_of_sites),
+                         "Lat": random.uniform(47, 47.2, number_of_sites),
+                         "Temperature": [100] * number_of_sites, "id": range(number_of_sites),
+                         column: random.uniform(1, 100, number_of_sites)})
+
+
+def random_network():
+    random = np.random.RandomState(0)
+    heat_sources = random_sites(8, random, "Excess_heat")
+    heat_sinks = random_sites(10, random, "Heat_demand")
+    network = DHNetwork(heat_sources, heat_sinks, random.uniform(0, 5000, (12, 8)), random.uniform(0, 5000, (12, 10)))
+    network.time_unit = "month"
+    return network
+
+
+def indicators(network):
+    return [network.number_of_transmission_lines(mode="total"), network.heat_used(mode="total"),
+            network.heat_delivered(mode="total"), network.heat_lost(mode="total"),
+            network.compute_transmission_line_costs(typ="annuity", mode="total"),
+            network.compute_pump_costs(typ="annuity", mode="total"), network.pump_energy_costs(mode="total")]
+
+
+class TestDHNetworkIndicators(unittest.TestCase):
+
+    def test_indicators(self):
+        # indicators of the network before the graph and flow solver were optimized
+        network = random_network()
+        network.fixed_radius_search(10000)
+        network.reduce_to_minimum_spanning_tree()
+        network.compute_flow()
+        np.testing.assert_allclose([17, 218237.4622312, 21312.18667793, 196925.2755533, 3023041.923915,
+                                    163955059.0348, 317.0295407425], indicators(network), rtol=1e-6)
+
+        network.remove_lines_above_threshold_recursive(50)
+        network.compute_flow()
+        np.testing.assert_allclose([11, 156860.2169602, 70407.80118173, 86452.41577851, 1254391.757909,
+                                    124984985.4437, 123.3324216296], indicators(network), rtol=1e-6)
+
+        self.assertAlmostEqual(26.84254296198, network.remove_edge_with_highest_specific_cost(mode="total",
+                                                                                              return_costs=True), 4)
+        network.compute_flow()
+        np.testing.assert_allclose([10, 144265.6375752, 74445.89135984, 69819.74621532, 1035189.964094,
+                                    127290863.0411, 129.1285775618], indicators(network), rtol=1e-6)
+
+    def test_tree_flow_solver(self):
+        # the tree solver transports the same heat but splits it differently among the lines
+        network = random_network()
+        network.tree_flow_solver = True
+        network.fixed_radius_search(10000)
+        network.reduce_to_minimum_spanning_tree()
+        network.compute_flow()
+        self.assertAlmostEqual(218237.4622312, network.heat_used(mode="total"), 3)
+        self.assertNotAlmostEqual(317.0295407425, network.pump_energy_costs(mode="total"), 3)
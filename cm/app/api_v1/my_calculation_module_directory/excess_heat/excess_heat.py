@@ -19,6 +19,7 @@ def excess_heat(inputs_parameter_selection, inputs_raster_selection, industrial_
     discount_rate = inputs_parameter_selection["discount_rate"]
     transmission_line_threshold = inputs_parameter_selection["transmission_line_threshold"]
     time_resolution = inputs_parameter_selection["time_resolution"]
+    number_of_processes = inputs_parameter_selection["number_of_processes"]
     #spatial_resolution = inputs_parameter_selection["spatial_resolution"]
 
     # create logger
@@ -124,6 +125,8 @@ def excess_heat(inputs_parameter_selection, inputs_raster_selection, industrial_
     cost_approximation_network.discount_rate = discount_rate
     cost_approximation_network.country = nuts0_id[0]
     cost_approximation_network.temperature = 100
+    cost_approximation_network.number_of_processes = number_of_processes
+    cost_approximation_network.projected_coordinates = True
     cost_approximation_network.fixed_radius_search(search_radius)
     cost_approximation_network.reduce_to_minimum_spanning_tree()
     cost_approximation_network.compute_flow()
@@ -150,6 +153,8 @@ def excess_heat(inputs_parameter_selection, inputs_raster_selection, industrial_
     network.discount_rate = discount_rate
     network.country = nuts0_id[0]
     network.temperature = 100
+    network.number_of_processes = number_of_processes
+    network.projected_coordinates = True
 
     network.fixed_radius_search(search_radius)
     if network.number_of_transmission_lines(mode="total") == 0:
@@ -1,8 +1,322 @@
-import copy
-
 from igraph import Graph, plot
 import numpy as np
-from collections import Counter
+from scipy.sparse import coo_matrix, csr_matrix, issparse
+from scipy.sparse.csgraph import breadth_first_order, connected_components, minimum_spanning_tree
+try:
+    from scipy.sparse.csgraph import maximum_flow as _csgraph_maximum_flow
+except ImportError:
+    # scipy < 1.4, the csgraph backend uses _augmenting_path_flow() instead
+    _csgraph_maximum_flow = None
+
+# vertex type codes of the vertex_types() arrays
+SOURCE_TYPE = 0
+SINK_TYPE = 1
+
+# backends of maximum_flow() for graphs with cycles. "igraph" applies the push relabel algorithm of igraph, which leaks
+# memory. "csgraph" computes the flow on integer capacities with scipy or the augmenting path solver of this module.
+MAX_FLOW_BACKENDS = ("igraph", "csgraph")
+# integer capacity the larger of the total supply and the total demand is scaled to by the csgraph backend
+FLOW_RESOLUTION = 2 ** 24
+# bound of the summed capacities of parallel arcs passed to csgraph as int32, far above FLOW_RESOLUTION
+MAX_ARC_CAPACITY = 2 ** 30
+
+
+def _number_of_rows(adjacency):
+    """
+    function returning the number of rows of an adjacency list or sparse adjacency matrix.
+    """
+    if issparse(adjacency):
+        return adjacency.shape[0]
+    return len(adjacency)
+
+
+def _adjacency_to_edges(adjacency):
+    """
+    function flattening an adjacency list or sparse adjacency matrix to the row and column indices of its entries in
+    row major order.
+
+    :param adjacency: adjacency list or sparse adjacency matrix. The explicitly stored entries of a sparse matrix are
+                      the connections.
+    :type adjacency: list or scipy sparse matrix. [[1, 3], [], ...]
+
+    :return: row and column indices.
+    :rtype: tuple of numpy arrays.
+    """
+    if issparse(adjacency):
+        adjacency = adjacency.tocsr()
+        rows = np.repeat(np.arange(adjacency.shape[0]), np.diff(adjacency.indptr))
+        return rows, adjacency.indices.astype(int)
+    rows = np.repeat(np.arange(len(adjacency)), [len(row) for row in adjacency])
+    columns = np.fromiter((column for row in adjacency for column in row), dtype=int, count=rows.shape[0])
+    return rows, columns
+
+
+def _adjacency_to_attributes(adjacency):
+    """
+    function flattening the attributes of an adjacency list or the entries of a sparse adjacency matrix in row major
+    order.
+
+    :return: attributes.
+    :rtype: list.
+    """
+    if issparse(adjacency):
+        return adjacency.tocsr().data.tolist()
+    return [attribute for attributes in adjacency for attribute in attributes]
+
+
+def _component_membership(edges, number_of_vertices):
+    """
+    function computing the connected component of every vertex of an undirected graph.
+
+    :param edges: source and target vertex of every edge.
+    :type edges: numpy array. shape (number of edges, 2)
+    :param number_of_vertices: number of vertices of the graph.
+    :type number_of_vertices: int.
+
+    :return: component of every vertex.
+    :rtype: numpy array.
+    """
+    adjacency = coo_matrix((np.ones(edges.shape[0]), (edges[:, 0], edges[:, 1])),
+                           shape=(number_of_vertices, number_of_vertices))
+    _, membership = connected_components(adjacency, directed=False)
+    return membership
+
+
+def _renumber_components(membership):
+    """
+    function renumbering components consecutively in order of their first vertex.
+
+    :param membership: component of every vertex.
+    :type membership: numpy array.
+
+    :return: renumbered component of every vertex.
+    :rtype: numpy array.
+    """
+    _, first_vertices, membership = np.unique(membership, return_index=True, return_inverse=True)
+    order = np.empty(first_vertices.shape[0], dtype=int)
+    order[np.argsort(first_vertices)] = np.arange(first_vertices.shape[0])
+    return order[membership.reshape(-1)]
+
+
+def _simple_edges(edges, number_of_vertices):
+    """
+    function selecting the edges of a simple graph, hence without loops and only the first of parallel edges.
+
+    :param edges: source and target vertex of every edge with the smaller vertex first.
+    :type edges: numpy array. shape (number of edges, 2)
+    :param number_of_vertices: number of vertices of the graph.
+    :type number_of_vertices: int.
+
+    :return: indices of the selected edges ordered by their vertices.
+    :rtype: numpy array.
+    """
+    _, edge_ids = np.unique(edges[:, 0] * number_of_vertices + edges[:, 1], return_index=True)
+    return edge_ids[edges[edge_ids, 0] != edges[edge_ids, 1]]
+
+
+def _correspondence_groups(correspondence):
+    """
+    function grouping the members of a correspondence list by their correspondence.
+
+    :param correspondence: correspondence of every member.
+    :type correspondence: list.
+
+    :return: members of every correspondence in order of the first appearance of the correspondence.
+    :rtype: dict. {correspondence: [member, ...]}
+    """
+    groups = {}
+    for member, member_correspondence in enumerate(correspondence):
+        if member_correspondence in groups:
+            groups[member_correspondence].append(member)
+        else:
+            groups[member_correspondence] = [member]
+    return groups
+
+
+def _correspondence_positions(correspondence):
+    """
+    function computing the position of the correspondence of every member in order of the first appearance of the
+    correspondence, hence the index of the coherent source or sink every member belongs to.
+
+    :param correspondence: correspondence of every member.
+    :type correspondence: list.
+
+    :return: position of the correspondence of every member.
+    :rtype: numpy array.
+    """
+    positions = np.empty(len(correspondence), dtype=int)
+    for position, members in enumerate(_correspondence_groups(correspondence).values()):
+        positions[members] = position
+    return positions
+
+
+def _aggregation_matrix(groups, number_of_groups):
+    """
+    function building a sparse matrix summing the rows of a matrix by group if multiplied from the left with its
+    transpose.
+
+    :param groups: group of every row.
+    :type groups: numpy array.
+    :param number_of_groups: number of groups.
+    :type number_of_groups: int.
+
+    :return: matrix with a single one per row in the column of its group.
+    :rtype: scipy csr_matrix. shape (number of rows, number of groups)
+    """
+    return csr_matrix((np.ones(groups.shape[0]), (np.arange(groups.shape[0]), groups)),
+                      shape=(groups.shape[0], number_of_groups))
+
+
+def _rooted_forest(edges, number_of_vertices):
+    """
+    function rooting every tree of a forest at its first vertex. The roots are connected to an additional virtual root
+    vertex number_of_vertices, hence the forest is traversed as a single tree.
+
+    :param edges: source and target vertex of every edge.
+    :type edges: numpy array. shape (number of edges, 2)
+    :param number_of_vertices: number of vertices of the graph.
+    :type number_of_vertices: int.
+
+    :return: None if the graph contains a cycle. Otherwise the component and the parent of every vertex and the levels
+             of the breadth first traversal below the virtual root. Each level consists of its vertices grouped by
+             their parent, the start of each group and the parent of each group.
+    :rtype: tuple. (numpy array, numpy array, [(numpy array, numpy array, numpy array), ...])
+    """
+    membership = _renumber_components(_component_membership(edges, number_of_vertices))
+    number_of_components = np.max(membership) + 1 if number_of_vertices > 0 else 0
+    if edges.shape[0] != number_of_vertices - number_of_components:
+        return None
+
+    _, roots = np.unique(membership, return_index=True)
+    virtual_root = number_of_vertices
+    adjacency = coo_matrix((np.ones(edges.shape[0] + roots.shape[0]),
+                            (np.concatenate((edges[:, 0], np.full(roots.shape[0], virtual_root))),
+                             np.concatenate((edges[:, 1], roots)))),
+                           shape=(number_of_vertices + 1, number_of_vertices + 1)).tocsr()
+    order, parents = breadth_first_order(adjacency, virtual_root, directed=False, return_predecessors=True)
+
+    # the breadth first order visits the children of every vertex consecutively and the parents in the order of their
+    # positions, hence the positions of the parents are sorted and each level is a contiguous slice of the order
+    position = np.empty(number_of_vertices + 1, dtype=int)
+    position[order] = np.arange(order.shape[0])
+    parent_position = np.append(-1, position[parents[order[1:]]])
+    levels = []
+    start, end = 1, 1 + roots.shape[0]
+    while start < end:
+        vertices = order[start:end]
+        group_starts = np.flatnonzero(np.diff(parent_position[start:end], prepend=-1))
+        levels.append((vertices, group_starts, parents[vertices[group_starts]]))
+        start, end = end, np.searchsorted(parent_position, end)
+    return membership, parents[:number_of_vertices], levels
+
+
+def _augmenting_path_flow(edges, capacities, source, sink, number_of_vertices):
+    """
+    function computing the maximum flow of an undirected graph with integer capacities by augmenting the flow along
+    shortest paths (Edmonds Karp algorithm). Each path is found by a breadth first search of scipy, hence only the
+    augmentation is done in python.
+
+    :param edges: source and target vertex of every edge.
+    :type edges: numpy array. shape (number of edges, 2)
+    :param capacities: integer capacity of every edge.
+    :type capacities: numpy array.
+    :param source: source vertex of the flow.
+    :type source: int.
+    :param sink: sink vertex of the flow.
+    :type sink: int.
+    :param number_of_vertices: number of vertices of the graph.
+    :type number_of_vertices: int.
+
+    :return: flow through every edge, positive from its source to its target vertex.
+    :rtype: numpy array of int64.
+    """
+    number_of_edges = edges.shape[0]
+    capacities = np.asarray(capacities, dtype=np.int64)
+    flow = np.zeros(number_of_edges, dtype=np.int64)
+
+    # every edge is a pair of opposite arcs, sorted by their vertices to look up the arcs of a path
+    tails = np.concatenate((edges[:, 0], edges[:, 1]))
+    heads = np.concatenate((edges[:, 1], edges[:, 0]))
+    order = np.lexsort((heads, tails))
+    tails, heads = tails[order], heads[order]
+    keys = tails * number_of_vertices + heads
+    arc_edges = np.tile(np.arange(number_of_edges), 2)[order]
+    arc_signs = np.repeat([1, -1], number_of_edges)[order]
+
+    while True:
+        residual = capacities[arc_edges] - arc_signs * flow[arc_edges]
+        open_arcs = np.flatnonzero(residual > 0)
+        residual_graph = csr_matrix((np.ones(open_arcs.shape[0]), (tails[open_arcs], heads[open_arcs])),
+                                    shape=(number_of_vertices, number_of_vertices))
+        _, predecessors = breadth_first_order(residual_graph, source, directed=True, return_predecessors=True)
+        if predecessors[sink] < 0:
+            return flow
+
+        path = [sink]
+        while path[-1] != source:
+            path.append(predecessors[path[-1]])
+        path = np.array(path[::-1])
+        # any open arc connecting the consecutive vertices of the path
+        arcs = open_arcs[np.searchsorted(keys[open_arcs], path[:-1] * number_of_vertices + path[1:])]
+        flow[arc_edges[arcs]] += arc_signs[arcs] * np.min(residual[arcs])
+
+
+def _integer_maximum_flow(edges, capacities, source, sink, number_of_vertices):
+    """
+    function computing the maximum flow of an undirected graph with integer capacities. scipy.sparse.csgraph is used
+    if available, otherwise _augmenting_path_flow(). Neither allocates memory that is not freed.
+
+    :param edges: source and target vertex of every edge.
+    :type edges: numpy array. shape (number of edges, 2)
+    :param capacities: integer capacity of every edge. The capacities of parallel edges are summed and clipped to
+                       MAX_ARC_CAPACITY.
+    :type capacities: numpy array.
+    :param source: source vertex of the flow.
+    :type source: int.
+    :param sink: sink vertex of the flow.
+    :type sink: int.
+    :param number_of_vertices: number of vertices of the graph.
+    :type number_of_vertices: int.
+
+    :return: flow through every edge, positive from its source to its target vertex.
+    :rtype: numpy array.
+    """
+    if _csgraph_maximum_flow is None:
+        return _augmenting_path_flow(edges, capacities, source, sink, number_of_vertices)
+
+    flow = np.zeros(edges.shape[0])
+    not_loop = edges[:, 0] != edges[:, 1]
+    vertex1, vertex2 = edges[not_loop, 0], edges[not_loop, 1]
+    capacities = np.asarray(capacities)[not_loop]
+
+    # both arcs of every edge, parallel arcs are merged by summing their capacities
+    keys, arcs = np.unique(np.concatenate((vertex1 * number_of_vertices + vertex2,
+                                           vertex2 * number_of_vertices + vertex1)), return_inverse=True)
+    arcs = arcs.reshape(-1)
+    indptr = np.searchsorted(keys, np.arange(number_of_vertices + 1) * number_of_vertices).astype(np.int32)
+    arc_capacities = np.zeros(keys.shape[0], dtype=np.int64)
+    np.add.at(arc_capacities, arcs, np.concatenate((capacities, capacities)).astype(np.int64))
+    # csgraph needs int32 capacities, the clipped capacity still exceeds every flow through an arc
+    graph = csr_matrix((np.minimum(arc_capacities, MAX_ARC_CAPACITY).astype(np.int32),
+                        (keys % number_of_vertices).astype(np.int32), indptr),
+                       shape=(number_of_vertices, number_of_vertices))
+    result = _csgraph_maximum_flow(graph, source, sink)
+    # the flow matrix is called residual before scipy 1.8
+    flow_matrix = (result.flow if hasattr(result, "flow") else result.residual).tocsr()
+
+    # look up the flow of the arcs from the first to the second vertex of every edge
+    flow_matrix.sort_indices()
+    flow_keys = np.repeat(np.arange(number_of_vertices), np.diff(flow_matrix.indptr)) * number_of_vertices + \
+        flow_matrix.indices
+    positions = np.minimum(np.searchsorted(flow_keys, keys), max(flow_keys.shape[0] - 1, 0))
+    arc_flow = np.where(flow_keys[positions] == keys, flow_matrix.data[positions], 0) if flow_keys.shape[0] > 0 \
+        else np.zeros(keys.shape[0])
+
+    # parallel edges share the flow of their arc in proportion to their capacities
+    arcs = arcs[:vertex1.shape[0]]
+    flow[not_loop] = np.divide(arc_flow[arcs] * capacities, arc_capacities[arcs], out=np.zeros(arcs.shape[0]),
+                               where=arc_capacities[arcs] > 0)
+    return flow
 
 
 class NetworkGraph:
@@ -10,6 +324,15 @@ class NetworkGraph:
     Class wrapping igraph functionality for the planning and debugging of source sink flow models. It strictly differs
     between source and sink vertices which may be important for further analysis. It can handle coherent sources
     and sinks, which are already connected (internally).
+
+    The graph, the correspondence graph and the max flow graph share a single igraph Graph, the edge store. Its
+    vertices are ordered as sources, sinks, correspondence nodes of sources, correspondence nodes of sinks, infinite
+    source and infinite sink. Its edges are ordered as edges of the graph, edges to the correspondence nodes and edges
+    to the infinite source and sink. Hence the graph and the correspondence graph are prefixes of the max flow graph and
+    every view is updated by deleting edges of the graph in place.
+
+    Sources and sinks are stored in ascending order of their ID's. Their ID's are kept in a single integer array instead
+    of vertex attributes, colors are only derived for plotting.
     """
 
     def __init__(self, source_sink_edges, source_source_edges, sink_sink_edges,
@@ -39,28 +362,39 @@ class NetworkGraph:
         Attributes:
             number_of_sources: Number of source vertices. Int.
             number_of_sinks: Number of sink vertices. Int.
-            vertex_to_source: Maps vertex ID to source ID. Dic.
-            vertex_to_sink: Maps vertex ID to sink ID. Dic.
-            source_to_vertex: Maps source ID to vertex ID. Dic.
-            sink_to_vertex: Maps sink ID to vertex ID. Dic.
-            graph: Graph containing all vertices and edges. igraph Graph.
-            max_flow_graph: slightly altered graph for max_flow calculations. igraph Graph.
+            _vertex_ids: Source ID of every source vertex followed by the sink ID of every sink vertex. Read only
+                         numpy array of int32.
+            edge_store: Graph containing the vertices and edges of all views. igraph Graph.
+            graph: Graph containing all sources, sinks and edges. Read only snapshot copied from a prefix of the edge
+                   store on every access. igraph Graph.
+            correspondence_graph: graph with additional correspondence nodes. Read only snapshot copied from a prefix
+                                  of the edge store on every access. igraph Graph.
+            max_flow_graph: slightly altered graph for max_flow calculations. Same object as the edge store.
+                            igraph Graph.
+            number_of_correspondence_edges: Number of edges connecting coherent sources or sinks with their
+                                            correspondence node. Int.
+            number_of_super_edges: Number of edges connected to the infinite source or sink. Int.
             infinite_source_vertex: Vertex ID of the infinte source vertex in the max_flow_graph. Int.
             infinite_sink_vertex: Vertex ID of the infinite sink vertex in the max_flow_graph. Int.
+            edge_version: Counter incremented whenever the edges of the graph change, hence flows computed at the same
+                          edge version are still valid. Int.
         """
 
-        self.number_of_sources = len(source_source_edges)
-        self.number_of_sinks = len(sink_sink_edges)
+        self.number_of_sources = _number_of_rows(source_source_edges)
+        self.number_of_sinks = _number_of_rows(sink_sink_edges)
 
         # specified later by the build_graph() method
-        self.vertex_to_source = {}
-        self.vertex_to_sink = {}
-        self.source_to_vertex = {}
-        self.sink_to_vertex = {}
-        self.graph = Graph()
+        self._vertex_ids = np.zeros(0, dtype=np.int32)
+        self.edge_store = Graph()
+        # read only vertex types, computed on first use and reset whenever the vertices change
+        self._vertex_types = None
+        # rooted forest of the graph with its correspondence nodes used by the tree flow solver, computed on first use
+        # and reset whenever the edges change. False if the graph contains cycles.
+        self._forest = None
+        self.edge_version = 0
 
         # specified later by  the build_correspondence_graph()
-        self.correspondence_graph = Graph()
+        self.number_of_correspondence_edges = 0
         if len(source_correspondence) != self.number_of_sources:
             raise ValueError("length of source correspondence must be equal to number of sources")
         self.source_correspondence = source_correspondence
@@ -74,17 +408,49 @@ class NetworkGraph:
         self.number_of_coherent_sinks = 0
 
         # specified later by the build_max_flow_graph() method
-        self.max_flow_graph = Graph()
+        self.number_of_super_edges = 0
         self.infinite_source_vertex = 0
         self.infinite_sink_vertex = 0
 
-        # build self.graph with given inputs
+        # build the edge store with given inputs
         self.build_graph(source_sink_edges, source_source_edges, sink_sink_edges)
-        # build self.correspondence_graph based on self.graph
+        # append the correspondence nodes to the edge store
         self.build_correspondence_graph()
-        # build self.max_flow_graph based on self.graph
+        # append the infinite source and sink to the edge store
         self.build_max_flow_graph()
 
+    @property
+    def graph(self):
+        """
+        igraph Graph containing the sources, sinks and edges between them. Read only snapshot: every access copies the
+        edge store, hence changes of the returned graph, e.g. of its edge attributes, are lost. Use add_edge_attribute()
+        and delete_edges() to change the NetworkGraph and keep the returned graph instead of accessing the property
+        repeatedly.
+        """
+        graph = self.edge_store.subgraph_edges(list(range(self.number_of_edges())), delete_vertices=False)
+        graph.delete_vertices(list(range(self.number_of_vertices(), graph.vcount())))
+        return graph
+
+    @property
+    def correspondence_graph(self):
+        """
+        igraph Graph containing the graph and the correspondence nodes connecting coherent sources or sinks. Read only
+        snapshot copied on every access, see graph.
+        """
+        graph = self.edge_store.subgraph_edges(
+            list(range(self.number_of_edges() + self.number_of_correspondence_edges)), delete_vertices=False)
+        number_of_vertices = self.number_of_vertices() + len(self.connecting_node_of_source_correspondence) + \
+            len(self.connecting_node_of_sink_correspondence)
+        graph.delete_vertices(list(range(number_of_vertices, graph.vcount())))
+        return graph
+
+    @property
+    def max_flow_graph(self):
+        """
+        igraph Graph required for max_flow computations. It is the edge store itself.
+        """
+        return self.edge_store
+
     def build_graph(self, source_sink_edges, source_source_edges, sink_sink_edges):
         """
         Method constructing the graph object
@@ -97,114 +463,82 @@ class NetworkGraph:
         :param sink_sink_edges: adjacency list containing the connections between sinks and other sinks.
         :type sink_sink_edges: list. [[sink1, sink2], [sink1, sink4], [], ...]
 
+        All adjacency lists may also be given as sparse adjacency matrices, e.g. the output of find_neighbours() with
+        output="sparse". The edges are added in the same order in both cases.
+
         :return:
         """
 
-        # map vertex ID's to source ID's
-        vertex_to_source = {}
-        for source, _ in enumerate(source_source_edges):
-            vertex_to_source[source] = source
-        self.vertex_to_source = vertex_to_source
-
-        # map vertex ID's to sink ID's
-        vertex_to_sink = {}
-        for sink, _ in enumerate(sink_sink_edges):
-            vertex_to_sink[self.number_of_sources + sink] = sink
-        self.vertex_to_sink = vertex_to_sink
-
-        # map source ID's to vertex ID's by reversing injective vertex_to_source dic.
-        source_to_vertex = {v: k for k, v in self.vertex_to_source.items()}
-        self.source_to_vertex = source_to_vertex
-        # map sink ID's to vertex ID's by reversing injective vertex_to_sink dic.
-        sink_to_vertex = {v: k for k, v in self.vertex_to_sink.items()}
-        self.sink_to_vertex = sink_to_vertex
-
-        # build igraph Graph object
-        g = Graph(directed=False)
-        g.add_vertices(self.number_of_sources + self.number_of_sinks)
-        g.vs["type"] = ["source"] * self.number_of_sources + ["sink"] * self.number_of_sinks
-        g.vs["id"] = list(range(self.number_of_sources)) + list(range(self.number_of_sinks))
-
-        # construct pairs of vertex ID's connected by the adjacency lists.
-        for source, sinks in enumerate(source_sink_edges):
-            for sink in sinks:
-                g.add_edge(source_to_vertex[source], sink_to_vertex[sink])
-        for source1, sources in enumerate(source_source_edges):
-            for source2 in sources:
-                g.add_edge(source_to_vertex[source1], source_to_vertex[source2])
-        for sink1, sinks in enumerate(sink_sink_edges):
-            for sink2 in sinks:
-                g.add_edge(sink_to_vertex[sink1], sink_to_vertex[sink2])
-
-        self.graph = g
-
-        # assigning source vertices a red color and sink vertices a blue color attribute
-        self.graph.vs["color"] = ["red"] * self.number_of_sources + ["blue"] * self.number_of_sinks
+        # the i-th source is vertex i and the i-th sink is vertex number_of_sources + i
+        self._set_vertex_ids(np.concatenate((np.arange(self.number_of_sources), np.arange(self.number_of_sinks))))
+
+        # construct pairs of vertex ID's connected by the adjacency lists. Sources are the first vertices followed by
+        # the sinks, hence the vertex ID of a sink is offset by the number of sources.
+        sources, sinks = _adjacency_to_edges(source_sink_edges)
+        sources1, sources2 = _adjacency_to_edges(source_source_edges)
+        sinks1, sinks2 = _adjacency_to_edges(sink_sink_edges)
+        edges = np.column_stack((np.concatenate((sources, sources1, sinks1 + self.number_of_sources)),
+                                 np.concatenate((sinks + self.number_of_sources, sources2,
+                                                 sinks2 + self.number_of_sources))))
+
+        # build igraph Graph object with all vertices and edges at once. The correspondence nodes and the infinite
+        # source and sink are appended later.
+        self.edge_store = Graph(n=self.number_of_sources + self.number_of_sinks, edges=edges.tolist(), directed=False)
+        self.number_of_correspondence_edges = 0
+        self.number_of_super_edges = 0
 
     def build_correspondence_graph(self):
         """
-        Method constructing the correspondence graph needed to connect coherent sources or sinks without costs.
+        Method appending the correspondence nodes needed to connect coherent sources or sinks without costs to the
+        edge store. Must be called once after build_graph().
 
         :return:
         """
-        g = copy.deepcopy(self.graph)
-
-        # check for sources with same correspondence. If two or more sources have the same correspondence the
-        # graph will need an additional node connecting them
-        c = Counter(self.source_correspondence)
-        coherent_sources_correspondence = [correspondence for correspondence in c if c[correspondence] > 1]
-        self.number_of_coherent_sources = len(c)
-        # check for sinks with same correspondence. If two or more sinks have the same correspondence the
-        # graph will need an additional node connecting them
-        c = Counter(self.sink_correspondence)
-        coherent_sinks_correspondence = [correspondence for correspondence in c if c[correspondence] > 1]
-        self.number_of_coherent_sinks = len(c)
-
-        # reinitialize the dict containing the node ids of the nodes used to connect each correspondence
+        g = self.edge_store
+        number_of_edges = g.ecount()
+
+        # group sources and sinks by their correspondence in a single pass. If two or more sources or sinks have the
+        # same correspondence the graph will need an additional node connecting them
+        source_groups = _correspondence_groups(self.source_correspondence)
+        self.number_of_coherent_sources = len(source_groups)
+        sink_groups = _correspondence_groups(self.sink_correspondence)
+        self.number_of_coherent_sinks = len(sink_groups)
+
+        # the k-th source or sink of the correspondence lists
+        source_vertices = range(self.number_of_sources)
+        sink_vertices = range(self.number_of_sources, self.number_of_vertices())
+
+        # reinitialize the dicts containing the node ids of the nodes used to connect each correspondence. The nodes
+        # are appended after the sources and sinks in order of the first appearance of their correspondence.
         self.connecting_node_of_source_correspondence = {}
-        # only iterate over correspondences with at least two members
-        for correspondence in coherent_sources_correspondence:
-            for source, source_correspondence in zip(self.source_to_vertex.keys(), self.source_correspondence):
-                if source_correspondence == correspondence:
-                    # check if a node for the correspondence already exists
-                    if correspondence in self.connecting_node_of_source_correspondence:
-                        # connect source with the correspondence node
-                        g.add_edge(self.connecting_node_of_source_correspondence[correspondence],
-                                   self.source_to_vertex[source])
-                    else:
-                        # if new correspondence encountered, adds new correspondence node
-                        g.add_vertices(1)
-                        self.connecting_node_of_source_correspondence[correspondence] = g.vcount() - 1
-                        g.add_edge(self.source_to_vertex[source],
-                                   self.connecting_node_of_source_correspondence[correspondence])
-
         self.connecting_node_of_sink_correspondence = {}
-        for correspondence in coherent_sinks_correspondence:
-            for sink, sink_correspondence in zip(self.sink_to_vertex.keys(), self.sink_correspondence):
-                if sink_correspondence == correspondence:
-                    if correspondence in self.connecting_node_of_sink_correspondence:
-                        g.add_edge(self.sink_to_vertex[sink],
-                                   self.connecting_node_of_sink_correspondence[correspondence])
-                    else:
-                        g.add_vertices(1)
-                        self.connecting_node_of_sink_correspondence[correspondence] = g.vcount() - 1
-                        g.add_edge(self.sink_to_vertex[sink],
-                                   self.connecting_node_of_sink_correspondence[correspondence])
-
-        self.correspondence_graph = g
-
-        self.correspondence_graph.vs["color"] = ["red"] * self.number_of_sources + ["blue"] * self.number_of_sinks +\
-                                                ["red"] * len(self.connecting_node_of_source_correspondence) +\
-                                                ["blue"] * len(self.connecting_node_of_sink_correspondence)
+        edges = []
+        connecting_node = g.vcount()
+        for groups, vertices, connecting_nodes in ((source_groups, source_vertices,
+                                                    self.connecting_node_of_source_correspondence),
+                                                   (sink_groups, sink_vertices,
+                                                    self.connecting_node_of_sink_correspondence)):
+            for correspondence, members in groups.items():
+                # only correspondences with at least two members
+                if len(members) > 1:
+                    connecting_nodes[correspondence] = connecting_node
+                    edges.extend((vertices[member], connecting_node) for member in members)
+                    connecting_node += 1
+
+        g.add_vertices(connecting_node - g.vcount())
+        g.add_edges(edges)
+
+        self.number_of_correspondence_edges = g.ecount() - number_of_edges
 
     def build_max_flow_graph(self):
         """
-        Method constructing the max_flow_graph object required for max_flow computations
+        Method appending the infinite source and sink required for max_flow computations to the edge store. Must be
+        called once after build_correspondence_graph().
 
         :return:
         """
 
-        g = copy.deepcopy(self.correspondence_graph)
+        g = self.edge_store
         # add infinite source and sink vertex
         g.add_vertices(2)
 
@@ -212,76 +546,154 @@ class NetworkGraph:
         self.infinite_source_vertex = g.vcount() - 2
         self.infinite_sink_vertex = g.vcount() - 1
 
-        # connect all sources with the infinite source and all sinks with the infinite sink by an edge
-        for source, correspondence in zip(self.source_to_vertex.keys(), self.source_correspondence):
+        # connect all sources with the infinite source and all sinks with the infinite sink by an edge. Coherent
+        # sources or sinks are connected once by their correspondence node. The edges are collected and added at once.
+        edges = []
+        connected_nodes = set()
+        for source, correspondence in enumerate(self.source_correspondence):
             if correspondence not in self.connecting_node_of_source_correspondence:
-                g.add_edge(self.infinite_source_vertex, self.source_to_vertex[source])
+                edges.append((self.infinite_source_vertex, source))
             else:
-                if not g.are_connected(self.infinite_source_vertex, self.connecting_node_of_source_correspondence[correspondence]):
-                    g.add_edge(self.infinite_source_vertex, self.connecting_node_of_source_correspondence[correspondence])
+                connecting_node = self.connecting_node_of_source_correspondence[correspondence]
+                if connecting_node not in connected_nodes:
+                    connected_nodes.add(connecting_node)
+                    edges.append((self.infinite_source_vertex, connecting_node))
 
-        for sink, correspondence in zip(self.sink_to_vertex.keys(), self.sink_correspondence):
+        for sink, correspondence in enumerate(self.sink_correspondence, self.number_of_sources):
             if correspondence not in self.connecting_node_of_sink_correspondence:
-                g.add_edge(self.infinite_sink_vertex, self.sink_to_vertex[sink])
+                edges.append((self.infinite_sink_vertex, sink))
             else:
-                if not g.are_connected(self.infinite_sink_vertex, self.connecting_node_of_sink_correspondence[correspondence]):
-                    g.add_edge(self.infinite_sink_vertex, self.connecting_node_of_sink_correspondence[correspondence])
+                connecting_node = self.connecting_node_of_sink_correspondence[correspondence]
+                if connecting_node not in connected_nodes:
+                    connected_nodes.add(connecting_node)
+                    edges.append((self.infinite_sink_vertex, connecting_node))
+        g.add_edges(edges)
+        self.number_of_super_edges = len(edges)
+        # cache the flow capacities. Edges of the graph and to the correspondence nodes have unrestricted flow, the
+        # capacities of the super edges are set by maximum_flow(). Deleting edges keeps the cache aligned.
+        g.es["flow_capacity"] = [1000] * (g.ecount() - self.number_of_super_edges) + [0] * self.number_of_super_edges
+        self._edges_changed()
+
+    def _set_vertex_ids(self, vertex_ids):
+        """
+        Method setting the ID's of the sources and sinks.
+
+        :param vertex_ids: source ID of every source vertex followed by the sink ID of every sink vertex. Both in
+                           ascending order.
+        :type vertex_ids: numpy array.
+        :return:
+        """
+
+        self._vertex_ids = np.array(vertex_ids, dtype=np.int32)
+        self._vertex_ids.setflags(write=False)
+        self._vertex_types = None
+
+    def _edges_changed(self):
+        """
+        Method resetting the caches depending on the edges and incrementing the edge version. Must be called whenever
+        edges are added or deleted.
+
+        :return:
+        """
+
+        self._forest = None
+        self.edge_version += 1
 
-        self.max_flow_graph = g
+    def _vertex_colors(self):
+        """
+        Method returning the plot color of every vertex of the edge store. Sources and their correspondence nodes and
+        the infinite source are red, sinks and their correspondence nodes and the infinite sink are blue.
+
+        :return: color of every vertex.
+        :rtype: list.
+        """
 
-        self.max_flow_graph.vs["color"] = ["red"] * self.number_of_sources + ["blue"] * self.number_of_sinks + \
+        return ["red"] * self.number_of_sources + ["blue"] * self.number_of_sinks + \
             ["red"] * len(self.connecting_node_of_source_correspondence) + \
             ["blue"] * len(self.connecting_node_of_sink_correspondence) + ["red"] + ["blue"]
 
-    @classmethod
-    def _from_graph_object(cls, graph, source_correspondence, sink_correspondence):
+    def _find_vertices(self, vertices):
         """
+        Method returning the vertex ID's of sources and sinks.
 
-        :param graph:
-        :param source_correspondence:
-        :param sink_correspondence:
-        :return:
+        :param vertices: tuples indicating if the vertex is a source or sink and its ID.
+        :type vertices: list. [("source", 1), ("sink", 0), ...]
+        :return: vertex ID of every source or sink, -1 if the graph does not contain it.
+        :rtype: numpy array.
         """
-        networkgraph = cls([], [], [], [], [])
-        number_of_sources = 0
-        number_of_sinks = 0
-        for vertex in graph.vs:
-            if vertex["type"] == "source":
-                number_of_sources += 1
-            elif vertex["type"] == "sink":
-                number_of_sinks += 1
 
+        is_source = np.array([vertex[0] == "source" for vertex in vertices], dtype=bool)
+        ids = np.array([vertex[1] for vertex in vertices], dtype=np.int64)
+        vertex_indices = np.full(len(vertices), -1, dtype=int)
+        for mask, offset, known_ids in ((is_source, 0, self._vertex_ids[:self.number_of_sources]),
+                                        (~is_source, self.number_of_sources,
+                                         self._vertex_ids[self.number_of_sources:])):
+            if known_ids.shape[0] == 0:
+                continue
+            # the ID's are sorted, hence a binary search finds the vertices
+            positions = np.minimum(np.searchsorted(known_ids, ids[mask]), known_ids.shape[0] - 1)
+            found = known_ids[positions] == ids[mask]
+            vertex_indices[np.flatnonzero(mask)[found]] = positions[found] + offset
+        return vertex_indices
+
+    @classmethod
+    def _from_graph_object(cls, graph, vertex_ids, number_of_sources, source_correspondence, sink_correspondence):
+        """
+        Method creating a NetworkGraph object from a graph of sources followed by sinks.
+
+        :param graph: graph containing the sources followed by the sinks and their edges.
+        :type graph: igraph Graph.
+        :param vertex_ids: source ID of every source followed by the sink ID of every sink. Both in ascending order.
+        :type vertex_ids: numpy array.
+        :param number_of_sources: number of sources of the graph.
+        :type number_of_sources: int.
+        :param source_correspondence: correspondence of every source.
+        :type source_correspondence: list.
+        :param sink_correspondence: correspondence of every sink.
+        :type sink_correspondence: list.
+        :return: NetworkGraph object using the graph as edge store.
+        :rtype: NetworkGraph.
+        """
+        networkgraph = cls([], [], [], [], [])
         networkgraph.number_of_sources = number_of_sources
-        networkgraph.number_of_sinks = number_of_sinks
-
-        # map vertex ID's to source ID's
-        vertex_to_source = {}
-        vertex_to_sink = {}
-        for vertex in graph.vs:
-            if vertex["type"] == "source":
-                vertex_to_source[vertex.index] = vertex["id"]
-            if vertex["type"] == "sink":
-                vertex_to_sink[vertex.index] = vertex["id"]
-
-        # map source ID's to vertex ID's by reversing injective vertex_to_source dic.
-        source_to_vertex = {v: k for k, v in vertex_to_source.items()}
-        source_to_vertex = source_to_vertex
-        # map sink ID's to vertex ID's by reversing injective vertex_to_sink dic.
-        sink_to_vertex = {v: k for k, v in vertex_to_sink.items()}
-        sink_to_vertex = sink_to_vertex
-        networkgraph.vertex_to_source = vertex_to_source
-        networkgraph.vertex_to_sink = vertex_to_sink
-        networkgraph.source_to_vertex = source_to_vertex
-        networkgraph.sink_to_vertex = sink_to_vertex
-        networkgraph.graph = graph
+        networkgraph.number_of_sinks = len(vertex_ids) - number_of_sources
+        networkgraph._set_vertex_ids(vertex_ids)
+        # the given graph becomes the edge store
+        networkgraph.edge_store = graph
+        networkgraph.number_of_correspondence_edges = 0
+        networkgraph.number_of_super_edges = 0
         networkgraph.source_correspondence = source_correspondence
         networkgraph.sink_correspondence = sink_correspondence
 
         networkgraph.build_correspondence_graph()
-        # build self.max_flow_graph based on self.graph
         networkgraph.build_max_flow_graph()
         return networkgraph
 
+    def __getstate__(self):
+        """
+        Method returning a compact state for pickling, e.g. to send the graph to a worker process. The edge store is
+        replaced by its number of vertices, an int32 array of its edges and an array per edge attribute. Cached arrays
+        are recomputed on first use.
+        """
+
+        state = self.__dict__.copy()
+        g = self.edge_store
+        state["edge_store"] = (g.vcount(), np.array(g.get_edgelist(), dtype=np.int32).reshape(-1, 2),
+                               {name: np.array(g.es[name]) for name in g.es.attributes()})
+        state["_vertex_types"] = None
+        state["_forest"] = None
+        return state
+
+    def __setstate__(self, state):
+        """
+        Method restoring the graph from the state returned by __getstate__().
+        """
+
+        number_of_vertices, edges, edge_attributes = state["edge_store"]
+        self.__dict__.update(state)
+        self.edge_store = Graph(n=number_of_vertices, edges=edges.tolist(), directed=False,
+                                edge_attrs={name: values.tolist() for name, values in edge_attributes.items()})
+
     def return_adjacency_lists(self):
         """
         method returning the adjacency list in the same style as required by the constructor. Hence three separate lists
@@ -295,32 +707,36 @@ class NetworkGraph:
         source_sink_adjacencies = []
         sink_sink_adjacencies = []
 
+        ids = self._vertex_ids.tolist()
+        number_of_vertices = self.number_of_vertices()
+
         # iterate through adjacency list of graph
-        for vertex1, vertices in enumerate(self.correspondence_graph.get_adjlist()):
+        # correspondence nodes and the infinite source and sink are neither sources nor sinks, hence they are skipped
+        for vertex1, vertices in enumerate(self.edge_store.get_adjlist()[:number_of_vertices]):
 
             # determine if vertex1 is a source or sink
-            if vertex1 in self.vertex_to_source.keys():
+            if vertex1 < self.number_of_sources:
                 source_source_adjacencies.append([])
                 source_sink_adjacencies.append([])
 
                 # iterate though sublist of adjacency list
                 for vertex2 in set(vertices):
                     # determine if vertex2 is a source or sink
-                    if vertex2 in self.vertex_to_source.keys():
+                    if vertex2 < self.number_of_sources:
                         if vertex1 < vertex2:
-                            source_source_adjacencies[-1].append(self.vertex_to_source[vertex2])
-                    elif vertex2 in self.vertex_to_sink.keys():
-                        source_sink_adjacencies[-1].append(self.vertex_to_sink[vertex2])
+                            source_source_adjacencies[-1].append(ids[vertex2])
+                    elif vertex2 < number_of_vertices:
+                        source_sink_adjacencies[-1].append(ids[vertex2])
 
-            elif vertex1 in self.vertex_to_sink.keys():
+            else:
                 sink_sink_adjacencies.append([])
 
                 # iterate though sublist of adjacency list
                 for vertex2 in set(vertices):
                     # determine if vertex2 is a source or sink
-                    if vertex2 in self.vertex_to_sink.keys():
+                    if self.number_of_sources <= vertex2 < number_of_vertices:
                         if vertex1 < vertex2:
-                            sink_sink_adjacencies[-1].append(self.vertex_to_sink[vertex2])
+                            sink_sink_adjacencies[-1].append(ids[vertex2])
 
         return source_sink_adjacencies, source_source_adjacencies, sink_sink_adjacencies
 
@@ -339,24 +755,16 @@ class NetworkGraph:
         :param sink_sink_attributes: Adjacency list but instead of indices it contains the value of the attribute. For
                                      this reason the list must have the exact same shape as the sink_sink_adjacency
                                      list
+        The attributes may also be given as sparse matrices whose entries are the values of the attribute.
+
         :return:
         """
 
-        edge_attributes = []
-        for attributes in source_sink_attributes:
-            for attribute in attributes:
-                edge_attributes.append(attribute)
-        for attributes in source_source_attributes:
-            for attribute in attributes:
-                edge_attributes.append(attribute)
-        for attributes in sink_sink_attributes:
-            for attribute in attributes:
-                edge_attributes.append(attribute)
-
-        if self.graph.ecount() == len(edge_attributes):
-            self.graph.es[name] = edge_attributes
-            self.correspondence_graph.es[name] = edge_attributes + [0] * (self.correspondence_graph.ecount() -
-                                                                          self.graph.ecount())
+        edge_attributes = _adjacency_to_attributes(source_sink_attributes) + \
+            _adjacency_to_attributes(source_source_attributes) + _adjacency_to_attributes(sink_sink_attributes)
+
+        if self.number_of_edges() == len(edge_attributes):
+            self.edge_store.es[name] = edge_attributes + [0] * (self.edge_store.ecount() - self.number_of_edges())
         else:
             raise ValueError("given attributes must have same shape as "
                              "source_sink_adjacencies, source_source_adjacencies, sink_sink_adjacencies")
@@ -372,29 +780,103 @@ class NetworkGraph:
         :rtype: list.
         """
 
-        return self.graph.es[name]
+        return self.edge_store.es[name][:self.number_of_edges()]
 
     def decompose_to_connected(self):
-        # decompose while discarding components with less than two elements, hence single vertices
-        components = self.correspondence_graph.decompose(minelements=2)
+        """
+        Method splitting the graph into its connected components. Sources or sinks with the same correspondence belong
+        to the same component. Components of single vertices are discarded.
+
+        :return: list of NetworkGraph objects, one for every component in order of their first vertex.
+        :rtype: list.
+        """
+
+        number_of_vertices = self.number_of_vertices()
+        number_of_edges = self.number_of_edges()
+        edges = np.array(self.edge_store.get_edgelist()[:number_of_edges + self.number_of_correspondence_edges],
+                         dtype=int).reshape(-1, 2)
+
+        # one membership vector for the sources, sinks and correspondence nodes partitions vertices and edges
+        membership = _component_membership(edges, self.infinite_source_vertex)
+        vertex_membership = _renumber_components(membership[:number_of_vertices])
+
+        # drop loops and parallel edges keeping the first one
+        edges = np.sort(edges[:number_of_edges], axis=1)
+        return self._split_components(edges, _simple_edges(edges, number_of_vertices), vertex_membership)
+
+    def decompose_to_minimum_spanning_trees(self, attribute_name):
+        """
+        Method splitting the minimum spanning tree of the graph into its connected components. Equal to
+        reduce_to_minimum_spanning_tree() followed by decompose_to_connected(), but the components are read from the
+        spanning forest and the graph itself remains unchanged.
+
+        :param attribute_name: attribute after which the minimum spanning tree is constructed.
+        :type attribute_name: str
+        :return: list of NetworkGraph objects, one for every component in order of their first vertex.
+        :rtype: list.
+        """
+
+        edges, merged, tree_edges = self._minimum_spanning_tree(attribute_name)
+
+        # the spanning forest connects the merged vertices exactly as the graph does
+        membership = _component_membership(np.column_stack((merged[edges[tree_edges, 0]],
+                                                            merged[edges[tree_edges, 1]])), merged.shape[0])
+        vertex_membership = _renumber_components(membership[merged[:self.number_of_vertices()]])
+
+        edges = np.sort(edges, axis=1)
+        tree_edges = tree_edges[_simple_edges(edges[tree_edges], self.number_of_vertices())]
+        return self._split_components(edges, tree_edges, vertex_membership)
+
+    def _split_components(self, edges, edge_ids, vertex_membership):
+        """
+        Method building a NetworkGraph object of every component with more than one vertex.
+
+        :param edges: source and target vertex of every edge of the graph with the smaller vertex first.
+        :type edges: numpy array. shape (number of edges, 2)
+        :param edge_ids: edges to keep ordered by their vertices.
+        :type edge_ids: numpy array.
+        :param vertex_membership: component of every vertex. Components are numbered in order of their first vertex.
+        :type vertex_membership: numpy array.
+        :return: list of NetworkGraph objects, one for every component in order of their first vertex.
+        :rtype: list.
+        """
+
+        number_of_vertices = self.number_of_vertices()
+        g = self.edge_store
+        component_sizes = np.bincount(vertex_membership)
+
+        # group the vertices by component while keeping their order
+        vertex_order = np.argsort(vertex_membership, kind="stable")
+        vertex_bounds = np.searchsorted(vertex_membership[vertex_order], np.arange(component_sizes.shape[0] + 1))
+        local_index = np.empty(number_of_vertices, dtype=int)
+        local_index[vertex_order] = np.arange(number_of_vertices) - \
+            np.repeat(vertex_bounds[:-1], np.diff(vertex_bounds))
+
+        # group the edges by component while keeping their order
+        edge_membership = vertex_membership[edges[edge_ids, 0]]
+        edge_ids = edge_ids[np.argsort(edge_membership, kind="stable")]
+        edge_bounds = np.searchsorted(np.sort(edge_membership), np.arange(component_sizes.shape[0] + 1))
+
+        edge_attributes = {name: np.array(g.es[name][:edges.shape[0]], dtype=object) for name in g.es.attributes()}
+        source_correspondence = np.array(self.source_correspondence, dtype=object)
+        sink_correspondence = np.array(self.sink_correspondence, dtype=object)
 
         new_objects = []
-        for component in components:
-
-            vertices_to_delete = []
-            source_correspondence = []
-            sink_correspondence = []
-            for vertex in component.vs:
-                if vertex["type"] != "source" and vertex["type"] != "sink":
-                    vertices_to_delete.append(vertex)
-                elif vertex["type"] == "source":
-                    source_correspondence.append(self.source_correspondence[vertex["id"]])
-                elif vertex["type"] == "sink":
-                    sink_correspondence.append(self.sink_correspondence[vertex["id"]])
-                component.delete_vertices(vertices_to_delete)
-
-            component.simplify(combine_edges="first")
-            new_objects.append(self._from_graph_object(component, source_correspondence, sink_correspondence))
+        # a component with a single source or sink has no edges. A correspondence node has at least two members
+        for component in np.flatnonzero(component_sizes > 1):
+            vertices = vertex_order[vertex_bounds[component]:vertex_bounds[component + 1]]
+            component_edge_ids = edge_ids[edge_bounds[component]:edge_bounds[component + 1]]
+            component_graph = Graph(n=vertices.shape[0], edges=local_index[edges[component_edge_ids]].tolist(),
+                                    directed=False,
+                                    edge_attrs={name: values[component_edge_ids].tolist()
+                                                for name, values in edge_attributes.items()})
+            # sources precede sinks in the vertex order
+            number_of_sources = np.count_nonzero(vertices < self.number_of_sources)
+            component_source_correspondence = source_correspondence[vertices[:number_of_sources]].tolist()
+            component_sink_correspondence = sink_correspondence[
+                vertices[number_of_sources:] - self.number_of_sources].tolist()
+            new_objects.append(self._from_graph_object(component_graph, self._vertex_ids[vertices], number_of_sources,
+                                                       component_source_correspondence, component_sink_correspondence))
         return new_objects
 
     def reduce_to_minimum_spanning_tree(self, attribute_name):
@@ -405,42 +887,62 @@ class NetworkGraph:
         :type attribute_name: str
         :return:
         """
-        # consider None values as 0
-        weights = [0 if v is None else v for v in self.correspondence_graph.es[attribute_name]]
-        self.correspondence_graph = \
-            self.correspondence_graph.spanning_tree(weights=weights)
-
-        for vertex in self.correspondence_graph.vs:
-            if vertex["type"] is None:
-                self.correspondence_graph.delete_vertices(vertex.index)
-        # get attributes from correspondence graph to update self.graph
-        attributes = []
-        for attribute in self.graph.es.attribute_names():
-            attributes.append((attribute, self.correspondence_graph.es[attribute]))
-
-        # check which edges are relevant for self.graph
-        non_correspondence_edges = []
-        for edge in self.correspondence_graph.es:
-            if (edge.source in self.vertex_to_source or edge.source in self.vertex_to_sink) and \
-                    (edge.target in self.vertex_to_source or edge.target in self.vertex_to_sink):
-                non_correspondence_edges.append((edge.source, edge.target))
-
-        # reset self.graph and rebuild according to the MST
-        self.graph = Graph()
-        self.graph.add_vertices(self.number_of_sources + self.number_of_sinks)
-        # assigning source vertices a red color and sink vertices a blue color attribute
-        self.graph.vs["color"] = ["red"] * self.number_of_sources + ["blue"] * self.number_of_sinks
-        self.graph.vs["type"] = self.correspondence_graph.vs["type"]
-        self.graph.vs["id"] = self.correspondence_graph.vs["id"]
-        self.graph.add_edges(non_correspondence_edges)
-        for attribute_name, values in attributes:
-            self.graph.es[attribute_name] = values[:len(non_correspondence_edges)]
-
-        # update correspondence graph and max flow graph
-        self.build_correspondence_graph()
-        self.build_max_flow_graph()
 
-    def maximum_flow(self, source_capacities, sink_capacities):
+        edges, _, tree_edges = self._minimum_spanning_tree(attribute_name)
+
+        # the edges to the correspondence nodes are kept, hence only edges of the graph are deleted from the store
+        in_tree = np.zeros(edges.shape[0], dtype=bool)
+        in_tree[tree_edges] = True
+        self.edge_store.delete_edges(np.flatnonzero(~in_tree).tolist())
+        self._edges_changed()
+
+    def _minimum_spanning_tree(self, attribute_name):
+        """
+        Method computing the minimum spanning forest of the graph by Kruskal's algorithm.
+
+        :param attribute_name: attribute after which the minimum spanning tree is constructed.
+        :type attribute_name: str
+        :return: source and target vertex of every edge of the graph, the vertex every source, sink and
+                 correspondence node is merged into and the indices of the edges of the spanning forest.
+        :rtype: tuple of numpy arrays.
+        """
+
+        number_of_edges = self.number_of_edges()
+        edge_list = self.edge_store.get_edgelist()
+        edges = np.array(edge_list[:number_of_edges], dtype=int).reshape(-1, 2)
+        # consider None values as 0
+        weights = np.array([0 if v is None else v for v in self.edge_store.es[attribute_name][:number_of_edges]],
+                           dtype=float)
+
+        # the correspondence edges have no costs and are always part of the tree, hence coherent sources or sinks are
+        # merged into their correspondence node beforehand
+        merged = np.arange(self.infinite_source_vertex)
+        correspondence_edges = np.array(edge_list[number_of_edges:number_of_edges +
+                                                  self.number_of_correspondence_edges], dtype=int).reshape(-1, 2)
+        merged[correspondence_edges[:, 0]] = correspondence_edges[:, 1]
+        vertex1 = np.minimum(merged[edges[:, 0]], merged[edges[:, 1]])
+        vertex2 = np.maximum(merged[edges[:, 0]], merged[edges[:, 1]])
+
+        # rank edges by weight, equal weights by descending edge ID. The ranks are unique positive weights, hence the
+        # tree is unique. Of parallel edges only the one with the lowest rank is a candidate
+        order = number_of_edges - 1 - np.argsort(weights[::-1], kind="stable")
+        rank = np.empty(number_of_edges, dtype=int)
+        rank[order] = np.arange(number_of_edges)
+        pairs = vertex1 * self.infinite_source_vertex + vertex2
+        candidates = order[np.argsort(pairs[order], kind="stable")]
+        first = np.ones(number_of_edges, dtype=bool)
+        first[1:] = pairs[candidates][1:] != pairs[candidates][:-1]
+        candidates = candidates[first & (vertex1[candidates] != vertex2[candidates])]
+
+        # Kruskal on the merged vertices
+        candidate_graph = coo_matrix((rank[candidates] + 1.0, (vertex1[candidates], vertex2[candidates])),
+                                     shape=(self.infinite_source_vertex, self.infinite_source_vertex))
+        tree = minimum_spanning_tree(candidate_graph.tocsr())
+        tree_ranks = np.round(tree.tocoo().data).astype(int) - 1
+
+        return edges, merged, np.sort(order[tree_ranks])
+
+    def maximum_flow(self, source_capacities, sink_capacities, backend="igraph", tree_solver=False):
         """
         function computing the maximum flow of a given source sink network
 
@@ -448,11 +950,19 @@ class NetworkGraph:
         :type source_capacities: list.
         :param sink_capacities: list containing the demand of each sink.
         :type sink_capacities: list.
+        :param backend: solver of the graph, one of MAX_FLOW_BACKENDS.
+        :type backend: str.
+        :param tree_solver: if True trees are solved analytically instead of by the backend, see maximum_flows().
+        :type tree_solver: bool.
         :return: returns a touple of three lists. The first one has the same length as source_capacities and contains
                  the actual flow of the sources. The second is indicating the flow of the sinks. The third one
                  indicates the flow though the edges of the graph.
         :rtype: tuple. ([], [], [])
 
+        The tree solver computes the same total flow, but if several sources can supply the same sinks every source and
+        sink contributes in proportion to its capacity. Hence the flow through an individual edge may differ from the
+        one of the push relabel algorithm, which may leave edges without flow that then carry a share. This changes the
+        line costs, pump costs and heat losses derived from the edge flows.
         """
         r"""
         This function is computing the maximum flow of all sources to sinks. In order to do so a graph is build
@@ -488,60 +998,249 @@ class NetworkGraph:
                                             \      |      /
                                             [infinite sink]
         
-        Now the Push-relabel maximum flow algorithm is applied to the graph.
+        Now the Push-relabel maximum flow algorithm is applied to the graph. If the tree solver is enabled and the
+        graph with its correspondence nodes is a tree or forest the flow is computed analytically instead, see
+        maximum_flows().
         
         Notes: 
         Unlike in the example the number of [su] does not have to be equal to [si].
         Neither does every [su] need an edge to [si] or vice versa.                            
         """
 
-        if len(source_capacities) == self.number_of_sources and len(sink_capacities) == self.number_of_sinks:
-
-            effective_source_capacities = []
-            position = {}
-            for source_capacity, correspondence in zip(source_capacities, self.source_correspondence):
-                if correspondence in position:
-                    effective_source_capacities[position[correspondence]] += source_capacity
-                else:
-                    effective_source_capacities.append(source_capacity)
-                    position[correspondence] = len(effective_source_capacities) - 1
-
-            effective_sink_capacities = []
-            position = {}
-            for sink_capacity, correspondence in zip(sink_capacities, self.sink_correspondence):
-                if correspondence in position:
-                    effective_sink_capacities[position[correspondence]] += sink_capacity
-                else:
-                    effective_sink_capacities.append(sink_capacity)
-                    position[correspondence] = len(effective_sink_capacities) - 1
-
-            # find normalization so that the max capacity is 1
-
-            normalization = 1 / np.max(np.append(effective_source_capacities, effective_sink_capacities))
-            effective_source_capacities = np.array(effective_source_capacities) * normalization
-            effective_sink_capacities = np.array(effective_sink_capacities) * normalization
-            # give real edges unrestricted flow
-            flow_capacities = np.append([1000] * self.correspondence_graph.ecount(),
-                                        np.append(effective_source_capacities, effective_sink_capacities))
-
-            self.max_flow_graph.es["flow_capacity"] = flow_capacities
-
-            # NOTE igraph maxflow leaks memory including version 0.7.1.post6 (does not free some solution vector,
-            # hence leaks around 8*(number_of_sources + number_of_sinks + number_of_edges) bytes of memory every call)
-            solution = self.max_flow_graph.maxflow(self.infinite_source_vertex, self.infinite_sink_vertex, "flow_capacity")
-
-            # rescale flow to original, after weight normalization
-            solution = np.array(solution.flow) / normalization
-            source_flow = - solution[-self.number_of_coherent_sinks - self.number_of_coherent_sources:-self.number_of_coherent_sinks]
-            sink_flow = solution[-self.number_of_coherent_sinks:]
-            connection_flow = solution[:-self.number_of_coherent_sources - self.number_of_coherent_sinks -
-                                       (self.correspondence_graph.ecount() - self.graph.ecount())]
-
-            return source_flow, sink_flow, connection_flow
-        else:
+        if len(source_capacities) != self.number_of_sources or len(sink_capacities) != self.number_of_sinks:
             raise TypeError("Source capacites and sink capacities must have same length as the number of sources and "
                             "number of sinks in the graph")
 
+        # trees are solved analytically if enabled, see maximum_flows()
+        solver = self._general_flow_solver(backend)
+        if tree_solver and self._flow_forest():
+            flows = self._forest_flows(np.reshape(source_capacities, (1, -1)), np.reshape(sink_capacities, (1, -1)))
+            return tuple(flow[0] for flow in flows)
+        return solver(source_capacities, sink_capacities)
+
+    def _general_flow_solver(self, backend):
+        """
+        Method returning the method solving a single time step on graphs with cycles.
+
+        :param backend: one of MAX_FLOW_BACKENDS.
+        :type backend: str.
+        :return: _push_relabel_flow() or _integer_flow().
+        :rtype: method.
+        """
+
+        if backend == "igraph":
+            return self._push_relabel_flow
+        elif backend == "csgraph":
+            return self._integer_flow
+        raise ValueError("max flow backend must be one of " + ", ".join(MAX_FLOW_BACKENDS))
+
+    def _push_relabel_flow(self, source_capacities, sink_capacities):
+        """
+        Method computing the maximum flow of a single time step with the push relabel algorithm of igraph. See
+        maximum_flow() for the parameters and the return values.
+        """
+
+        effective_source_capacities = []
+        position = {}
+        for source_capacity, correspondence in zip(source_capacities, self.source_correspondence):
+            if correspondence in position:
+                effective_source_capacities[position[correspondence]] += source_capacity
+            else:
+                effective_source_capacities.append(source_capacity)
+                position[correspondence] = len(effective_source_capacities) - 1
+
+        effective_sink_capacities = []
+        position = {}
+        for sink_capacity, correspondence in zip(sink_capacities, self.sink_correspondence):
+            if correspondence in position:
+                effective_sink_capacities[position[correspondence]] += sink_capacity
+            else:
+                effective_sink_capacities.append(sink_capacity)
+                position[correspondence] = len(effective_sink_capacities) - 1
+
+        # no flow without supply or demand, which would also break the normalization
+        number_of_flow_edges = self.edge_store.ecount() - self.number_of_super_edges
+        maximum_capacity = np.max(np.append(effective_source_capacities, effective_sink_capacities), initial=0)
+        if maximum_capacity <= 0:
+            return (np.zeros(self.number_of_coherent_sources), np.zeros(self.number_of_coherent_sinks),
+                    np.zeros(self.number_of_edges()))
+
+        # find normalization so that the max capacity is 1
+        normalization = 1 / maximum_capacity
+        effective_source_capacities = np.array(effective_source_capacities) * normalization
+        effective_sink_capacities = np.array(effective_sink_capacities) * normalization
+        # real edges keep their cached unrestricted flow, hence only the capacities of the super edges are updated
+        self.edge_store.es[number_of_flow_edges:]["flow_capacity"] = \
+            np.append(effective_source_capacities, effective_sink_capacities).tolist()
+
+        # NOTE igraph maxflow leaks memory including version 0.7.1.post6 (does not free some solution vector,
+        # hence leaks around 8*(number_of_sources + number_of_sinks + number_of_edges) bytes of memory every call)
+        solution = self.edge_store.maxflow(self.infinite_source_vertex, self.infinite_sink_vertex, "flow_capacity")
+
+        # rescale flow to original, after weight normalization
+        solution = np.array(solution.flow) / normalization
+        # the super edges of the coherent sources are followed by the ones of the coherent sinks
+        source_flow = -solution[number_of_flow_edges:number_of_flow_edges + self.number_of_coherent_sources]
+        sink_flow = solution[number_of_flow_edges + self.number_of_coherent_sources:]
+        connection_flow = solution[:self.number_of_edges()]
+
+        return source_flow, sink_flow, connection_flow
+
+    def _integer_flow(self, source_capacities, sink_capacities):
+        """
+        Method computing the maximum flow of a single time step on integer capacities without igraph, hence without
+        leaking memory. The larger of the total supply and the total demand is scaled to FLOW_RESOLUTION and the edges
+        of the graph have unrestricted flow. See maximum_flow() for the parameters and the return values.
+        """
+
+        source_capacities = np.bincount(_correspondence_positions(self.source_correspondence),
+                                        weights=source_capacities, minlength=self.number_of_coherent_sources)
+        sink_capacities = np.bincount(_correspondence_positions(self.sink_correspondence),
+                                      weights=sink_capacities, minlength=self.number_of_coherent_sinks)
+        total = max(np.sum(source_capacities), np.sum(sink_capacities))
+        scale = FLOW_RESOLUTION / total if total > 0 else 0
+
+        # no edge can transport more than the total flow, hence FLOW_RESOLUTION is unrestricted
+        number_of_flow_edges = self.number_of_edges() + self.number_of_correspondence_edges
+        capacities = np.concatenate((np.full(number_of_flow_edges, FLOW_RESOLUTION),
+                                     np.floor(source_capacities * scale), np.floor(sink_capacities * scale)))
+        edges = np.array(self.edge_store.get_edgelist(), dtype=int).reshape(-1, 2)
+        solution = _integer_maximum_flow(edges, capacities.astype(np.int64), self.infinite_source_vertex,
+                                         self.infinite_sink_vertex, self.edge_store.vcount())
+        solution = solution / scale if scale > 0 else np.zeros(edges.shape[0])
+
+        # same signs as the push relabel algorithm
+        source_flow = -solution[number_of_flow_edges:number_of_flow_edges + self.number_of_coherent_sources]
+        sink_flow = solution[number_of_flow_edges + self.number_of_coherent_sources:]
+        connection_flow = solution[:self.number_of_edges()]
+
+        return source_flow, sink_flow, connection_flow
+
+    def maximum_flows(self, source_capacities, sink_capacities, backend="igraph", tree_solver=False):
+        """
+        Method computing the maximum flow of every time step in one call.
+
+        :param source_capacities: capacity of every source in every time step.
+        :type source_capacities: numpy array. shape (number of steps, number of sources)
+        :param sink_capacities: demand of every sink in every time step.
+        :type sink_capacities: numpy array. shape (number of steps, number of sinks)
+        :param backend: solver of the graph, one of MAX_FLOW_BACKENDS.
+        :type backend: str.
+        :param tree_solver: if True trees are solved analytically instead of by the backend.
+        :type tree_solver: bool.
+        :return: flow of the coherent sources, flow of the coherent sinks and flow through the edges of the graph in
+                 every time step, with the same signs as maximum_flow().
+        :rtype: tuple of numpy arrays. (shape (number of steps, number of coherent sources),
+                                        shape (number of steps, number of coherent sinks),
+                                        shape (number of steps, number of edges))
+
+        If the tree solver is enabled and the graph with its correspondence nodes is a forest the flow is computed
+        analytically for all time steps at once. Every tree transports the minimum of its supply and its demand and
+        every source and sink contributes in proportion to its capacity. The flow through an edge is the net supply of
+        the subtree below the edge, which is aggregated bottom up level by level. The totals are the ones of the
+        backend, but the flows through individual edges may differ, see maximum_flow(). Otherwise the solver of the
+        backend is applied to every time step.
+        """
+
+        source_capacities = np.asarray(source_capacities, dtype=float)
+        sink_capacities = np.asarray(sink_capacities, dtype=float)
+        if source_capacities.ndim != 2 or sink_capacities.ndim != 2 or \
+                source_capacities.shape[0] != sink_capacities.shape[0] or \
+                source_capacities.shape[1] != self.number_of_sources or \
+                sink_capacities.shape[1] != self.number_of_sinks:
+            raise TypeError("Source capacites and sink capacities must have one row per time step and one column per "
+                            "source or sink in the graph")
+
+        solver = self._general_flow_solver(backend)
+        if tree_solver and self._flow_forest():
+            return self._forest_flows(source_capacities, sink_capacities)
+
+        number_of_steps = source_capacities.shape[0]
+        flows = [solver(source_capacity, sink_capacity)
+                 for source_capacity, sink_capacity in zip(source_capacities, sink_capacities)]
+        return (np.array([flow[0] for flow in flows]).reshape(number_of_steps, self.number_of_coherent_sources),
+                np.array([flow[1] for flow in flows]).reshape(number_of_steps, self.number_of_coherent_sinks),
+                np.array([flow[2] for flow in flows]).reshape(number_of_steps, self.number_of_edges()))
+
+    def _flow_forest(self):
+        """
+        Method returning the structure of the graph with its correspondence nodes required by the tree flow solver. It
+        is cached until the edges change.
+
+        :return: False if the graph with its correspondence nodes contains cycles. Otherwise a dict containing the
+                 vertex and the tree of every coherent source and sink, the matrices summing the capacities of the
+                 coherent sources and sinks, the levels of the rooted forest as returned by _rooted_forest() and the
+                 child vertex and flow sign of every edge of the graph.
+        :rtype: dict or bool.
+        """
+
+        if self._forest is None:
+            number_of_flow_edges = self.number_of_edges() + self.number_of_correspondence_edges
+            edges = np.array(self.edge_store.get_edgelist(), dtype=int).reshape(-1, 2)
+            forest = _rooted_forest(edges[:number_of_flow_edges], self.infinite_source_vertex)
+            if forest is None:
+                self._forest = False
+                return self._forest
+            membership, parents, levels = forest
+
+            # the vertices connected to the infinite source or sink in order of the coherent sources and sinks
+            super_vertices = edges[number_of_flow_edges:, 0]
+            source_vertices = super_vertices[:self.number_of_coherent_sources]
+            sink_vertices = super_vertices[self.number_of_coherent_sources:]
+
+            # the net supply of a subtree flows from the child to the parent. igraph reports the flow of undirected
+            # edges as positive from the smaller to the larger vertex.
+            edges = edges[:self.number_of_edges()]
+            children = np.where(parents[edges[:, 0]] == edges[:, 1], edges[:, 0], edges[:, 1])
+
+            self._forest = {
+                "source_vertices": source_vertices,
+                "sink_vertices": sink_vertices,
+                "source_trees": membership[source_vertices],
+                "sink_trees": membership[sink_vertices],
+                "number_of_trees": np.max(membership) + 1 if membership.shape[0] > 0 else 0,
+                "source_aggregation": _aggregation_matrix(_correspondence_positions(self.source_correspondence),
+                                                         self.number_of_coherent_sources),
+                "sink_aggregation": _aggregation_matrix(_correspondence_positions(self.sink_correspondence),
+                                                       self.number_of_coherent_sinks),
+                "levels": levels,
+                "children": children,
+                "signs": np.where(children == edges[:, 0], 1, -1)
+            }
+        return self._forest
+
+    def _forest_flows(self, source_capacities, sink_capacities):
+        """
+        Method computing the maximum flow of every time step analytically if the graph with its correspondence nodes is
+        a forest. See maximum_flows() for the parameters and the return values.
+        """
+
+        forest = self._flow_forest()
+        number_of_steps = source_capacities.shape[0]
+
+        # capacities of the coherent sources and sinks
+        source_capacities = forest["source_aggregation"].T.dot(np.transpose(source_capacities)).T
+        sink_capacities = forest["sink_aggregation"].T.dot(np.transpose(sink_capacities)).T
+
+        # each tree transports the minimum of its supply and demand
+        supply = _aggregation_matrix(forest["source_trees"], forest["number_of_trees"]).T.dot(source_capacities.T).T
+        demand = _aggregation_matrix(forest["sink_trees"], forest["number_of_trees"]).T.dot(sink_capacities.T).T
+        flow = np.minimum(supply, demand)
+        source_share = np.divide(flow, supply, out=np.zeros_like(flow), where=supply > 0)
+        sink_share = np.divide(flow, demand, out=np.zeros_like(flow), where=demand > 0)
+        source_flow = source_capacities * source_share[:, forest["source_trees"]]
+        sink_flow = sink_capacities * sink_share[:, forest["sink_trees"]]
+
+        # net supply of every subtree, the last row belongs to the virtual root
+        net_supply = np.zeros((self.infinite_source_vertex + 1, number_of_steps))
+        net_supply[forest["source_vertices"]] = source_flow.T
+        net_supply[forest["sink_vertices"]] = -sink_flow.T
+        for vertices, group_starts, group_parents in reversed(forest["levels"]):
+            net_supply[group_parents] += np.add.reduceat(net_supply[vertices], group_starts, axis=0)
+        connection_flow = (net_supply[forest["children"]] * forest["signs"][:, None]).T
+
+        return source_flow, sink_flow, connection_flow
+
     def plot(self, source_coordinates, sink_coordinates):
         """
         Plots graph. Sources are red dots and sinks blue.
@@ -554,7 +1253,8 @@ class NetworkGraph:
         """
 
         # TODO automate proper layout and scaling of plot
-        plot(self.graph, layout=source_coordinates + sink_coordinates, bbox=(8000, 8000), vertex_size=5, edge_width=2)
+        plot(self.graph, layout=source_coordinates + sink_coordinates, bbox=(8000, 8000), vertex_size=5, edge_width=2,
+             vertex_color=self._vertex_colors()[:self.number_of_vertices()])
 
     def plot_all_connections(self, source_coordinates, sink_coordinates):
         """
@@ -580,7 +1280,7 @@ class NetworkGraph:
 
         plot(self.correspondence_graph, layout=source_coordinates + sink_coordinates +
              source_correspondence_coordinates + sink_correspondence_coordinates, bbox=(8000, 8000), vertex_size=5,
-             edge_width=2)
+             edge_width=2, vertex_color=self._vertex_colors()[:-2])
 
     def plot_max_flow_graph(self, source_coordinates, sink_coordinates):
         """
@@ -621,7 +1321,7 @@ class NetworkGraph:
         plot(self.max_flow_graph, layout=source_coordinates + sink_coordinates +
              source_correspondence_coordinates + sink_correspondence_coordinates + infinite_source_coordinate +
              infinite_sink_coordinate, bbox=(1000, 1000), vertex_size=5,
-             edge_width=2)
+             edge_width=2, vertex_color=self._vertex_colors())
 
     def edge_source_target_vertices(self):
         """
@@ -631,23 +1331,9 @@ class NetworkGraph:
         :rtype: list. [(), (), ()]
         """
 
-        edge_source_target = []
-
-        for edge in self.graph.es:
-            # determine is source of edge is a source or sink
-            if edge.source in self.vertex_to_source.keys():
-                source = ("source", self.vertex_to_source[edge.source])
-            else:
-                source = ("sink", self.vertex_to_sink[edge.source])
-            # determine if target of edge is a source or sink
-            if edge.target in self.vertex_to_source.keys():
-                target = ("source", self.vertex_to_source[edge.target])
-            else:
-                target = ("sink", self.vertex_to_sink[edge.target])
-
-            edge_source_target.append((source, target))
-
-        return edge_source_target
+        vertices = self.vertices()
+        return [(vertices[edge_source], vertices[edge_target])
+                for edge_source, edge_target in self.edge_store.get_edgelist()[:self.number_of_edges()]]
 
     def delete_edges(self, edges):
         """
@@ -659,23 +1345,14 @@ class NetworkGraph:
         :return:
         """
 
-        edges_to_delete = []
-        for source, target in edges:
-            if source[0] == "source":
-                index_source = self.source_to_vertex[source[1]]
-            else:
-                index_source = self.sink_to_vertex[source[1]]
-            if target[0] == "source":
-                index_target = self.source_to_vertex[target[1]]
-            else:
-                index_target = self.sink_to_vertex[target[1]]
-            edges_to_delete.append((index_source, index_target))
+        edges_to_delete = self._find_vertices([vertex for edge in edges for vertex in edge]).reshape(-1, 2)
+        if np.any(edges_to_delete < 0):
+            raise KeyError("edges to delete must connect vertices of the graph")
+        edges_to_delete = edges_to_delete.tolist()
 
-        self.graph.delete_edges(edges_to_delete)
-        # update correspondence graph
-        self.build_correspondence_graph()
-        # update max_flow graph
-        self.build_max_flow_graph()
+        # only edges of the graph are deleted, hence the order of the edge store remains valid for all views
+        self.edge_store.delete_edges(self.edge_store.get_eids(pairs=edges_to_delete))
+        self._edges_changed()
 
     def number_of_edges(self):
         """
@@ -685,7 +1362,7 @@ class NetworkGraph:
         :rtype: int.
         """
 
-        return self.graph.ecount()
+        return self.edge_store.ecount() - self.number_of_correspondence_edges - self.number_of_super_edges
 
     def number_of_vertices(self):
         """
@@ -695,7 +1372,7 @@ class NetworkGraph:
         :rtype: int.
         """
 
-        return self.graph.vcount()
+        return self.number_of_sources + self.number_of_sinks
 
     def vertices(self):
         """
@@ -705,21 +1382,35 @@ class NetworkGraph:
         :rtype: list. [(), (), ()]
         """
 
-        vertices = []
-        for vertex in self.graph.vs:
-            if vertex.index in self.vertex_to_source.keys():
-                vertices.append(("source", self.vertex_to_source[vertex.index]))
-            else:
-                vertices.append(("sink", self.vertex_to_sink[vertex.index]))
+        ids = self._vertex_ids.tolist()
+        return [("source", id_) for id_ in ids[:self.number_of_sources]] + \
+            [("sink", id_) for id_ in ids[self.number_of_sources:]]
+
+    def vertex_types(self):
+        """
+        Method returning the type of every vertex in the exact order stored in the graph. The array is cached and must
+        not be modified.
+
+        :return: SOURCE_TYPE for sources and SINK_TYPE for sinks.
+        :rtype: numpy array of int8.
+        """
 
-        return vertices
+        if self._vertex_types is None:
+            self._vertex_types = np.full(self.number_of_vertices(), SINK_TYPE, dtype=np.int8)
+            self._vertex_types[:self.number_of_sources] = SOURCE_TYPE
+            self._vertex_types.setflags(write=False)
+        return self._vertex_types
+
+    def vertex_ids(self):
+        """
+        Method returning the source or sink ID of every vertex in the exact order stored in the graph. The array must
+        not be modified.
+
+        :return: source ID for sources and sink ID for sinks.
+        :rtype: numpy array of int32.
+        """
+
+        return self._vertex_ids
 
     def contains_vertices(self, vertices):
-        for vertex in vertices:
-            if vertex[0] == "source":
-                if vertex[1] not in self.source_to_vertex.keys():
-                    return False
-            else:
-                if vertex[1] not in self.sink_to_vertex.keys():
-                    return False
-        return True
+        return bool(np.all(self._find_vertices(vertices) >= 0))
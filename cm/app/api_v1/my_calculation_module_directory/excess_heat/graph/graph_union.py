@@ -1,4 +1,38 @@
-from .graph import NetworkGraph
+from multiprocessing import Pool
+import numpy as np
+from .graph import NetworkGraph, SOURCE_TYPE
+
+# minimum number of time steps of all graphs to solve on a pool of worker processes. Fewer steps, e.g. the graphs split
+# by deleting an edge, are solved faster in the calling process than the pool is started.
+MIN_PARALLEL_STEPS = 2000
+
+
+def _maximum_flows_of_task(task):
+    """
+    function computing the maximum flows of a graph in a worker process.
+
+    :param task: graph, the capacities of its sources and sinks in every time step of the task, the max flow backend and
+                 whether trees are solved analytically.
+    :type task: tuple. (NetworkGraph, numpy array, numpy array, str, bool)
+
+    :return: output of NetworkGraph.maximum_flows().
+    :rtype: tuple of numpy arrays.
+    """
+    graph, source_capacities, sink_capacities, backend, tree_solver = task
+    return graph.maximum_flows(source_capacities, sink_capacities, backend=backend, tree_solver=tree_solver)
+
+
+def _read_only(capacities):
+    """
+    function checking whether capacities can not change, i.e. whether they are a read-only array owning its data.
+
+    :param capacities: capacity or demand of every source or sink in every time step.
+    :type capacities: numpy array.
+
+    :return: True if the capacities are read-only.
+    :rtype: bool.
+    """
+    return not capacities.flags.writeable and capacities.flags.owndata
 
 
 class NetworkGraphUnion:
@@ -7,9 +41,47 @@ class NetworkGraphUnion:
         graph = NetworkGraph(source_sink_edges, source_source_edges, sink_sink_edges, source_correspondence,
                              sink_correspondence)
         self.graphs = [graph]
+        # maps every vertex to the index of the graph containing it and its local vertex index in that graph
+        self.vertex_index = {}
+        # source and sink ID's of each graph in the vertex order of the graph
+        self.source_ids = []
+        self.sink_ids = []
+        # read-only capacities, solver options and flows of every graph of the last incremental maximum_flows() call
+        self.__solution = None
+        self.__index_components()
         for edge_attribute in edge_attributes:
             self.__add_edge_attribute(*edge_attribute)
 
+    def __index_components(self):
+        """
+        Method mapping every vertex to the index of the graph it belongs to and its local vertex index. Must be called
+        whenever the graphs change.
+
+        :return:
+        """
+
+        self.vertex_index = {}
+        self.source_ids = []
+        self.sink_ids = []
+        self.__solution = None
+        for index, graph in enumerate(self.graphs):
+            self.vertex_index.update((vertex, (index, local)) for local, vertex in enumerate(graph.vertices()))
+            is_source = graph.vertex_types() == SOURCE_TYPE
+            self.source_ids.append(graph.vertex_ids()[is_source])
+            self.sink_ids.append(graph.vertex_ids()[~is_source])
+
+    def locate_vertex(self, vertex):
+        """
+        Method returning the graph containing a vertex and the local index of the vertex in this graph.
+
+        :param vertex: tuple indicating if the vertex is a source or sink and its ID.
+        :type vertex: tuple. ("source", 1)
+        :return: index of the graph and local vertex index or None if no graph contains the vertex.
+        :rtype: tuple. (int, int)
+        """
+
+        return self.vertex_index.get(tuple(vertex))
+
     def __add_edge_attribute(self, name, source_sink_attributes, source_source_attributes, sink_sink_attributes):
         if len(self.graphs) > 1:
             raise ValueError("edge attribute can not be added if graph is decomposed")
@@ -32,20 +104,121 @@ class NetworkGraphUnion:
         for graph in self.graphs:
             new_graphs.append(graph.decompose_to_connected())
         self.graphs = [item for sublist in new_graphs for item in sublist]  # flatten output
+        self.__index_components()
 
-    def maximum_flow(self, source_capacities, sink_capacities):
-        maximum_flows = []
+    def decompose_to_minimum_spanning_trees(self, name):
+        new_graphs = []
         for graph in self.graphs:
-            vertices = graph.vertices()
-            sources = []
-            sinks = []
-            for vertex in vertices:
-                if vertex[0] == "source":
-                    sources.append(source_capacities[vertex[1]])
-                else:
-                    sinks.append(sink_capacities[vertex[1]])
-            maximum_flows.append(graph.maximum_flow(sources, sinks))
+            new_graphs.append(graph.decompose_to_minimum_spanning_trees(name))
+        self.graphs = [item for sublist in new_graphs for item in sublist]  # flatten output
+        self.__index_components()
+
+    def maximum_flow(self, source_capacities, sink_capacities, backend="igraph", tree_solver=False):
+        maximum_flows = []
+        source_capacities = np.asarray(source_capacities)
+        sink_capacities = np.asarray(sink_capacities)
+        for graph, source_ids, sink_ids in zip(self.graphs, self.source_ids, self.sink_ids):
+            maximum_flows.append(graph.maximum_flow(source_capacities[source_ids], sink_capacities[sink_ids],
+                                                    backend=backend, tree_solver=tree_solver))
+
+        return maximum_flows
+
+    def maximum_flows(self, source_capacities, sink_capacities, processes=1, backend="igraph", incremental=False,
+                      tree_solver=False):
+        """
+        Method computing the maximum flow of every graph for every time step in one call per graph.
+
+        :param source_capacities: capacity of every source in every time step.
+        :type source_capacities: numpy array. shape (number of steps, number of sources)
+        :param sink_capacities: demand of every sink in every time step.
+        :type sink_capacities: numpy array. shape (number of steps, number of sinks)
+        :param processes: number of worker processes. If larger than 1 the graphs are solved in parallel, split into
+                          chunks of time steps if there are fewer graphs than tasks needed to balance the load. Fewer
+                          than MIN_PARALLEL_STEPS time steps of all graphs to solve are solved without worker processes.
+        :type processes: int.
+        :param backend: solver of the graphs, one of MAX_FLOW_BACKENDS of the graph module.
+        :type backend: str.
+        :param incremental: if True the flows of the previous incremental call are reused for every graph whose edges
+                            did not change since, e.g. all graphs except the ones split by delete_edges(). This requires
+                            the same solver options and the same capacity arrays, which must be read-only arrays owning
+                            their data, e.g. made so by setflags(write=False). Writable capacities are always solved.
+        :type incremental: bool.
+        :param tree_solver: if True trees are solved analytically, see NetworkGraph.maximum_flows().
+        :type tree_solver: bool.
+        :return: output of NetworkGraph.maximum_flows() of every graph.
+        :rtype: list. [(numpy array, numpy array, numpy array), ...]
+        """
 
+        source_capacities = np.asarray(source_capacities)
+        sink_capacities = np.asarray(sink_capacities)
+        # flows of the previous incremental call by graph, valid as long as the edge version of the graph is the same
+        solved = {}
+        # read-only capacities can not change, hence they are compared by identity instead of by content
+        capacities = (source_capacities, sink_capacities) if \
+            _read_only(source_capacities) and _read_only(sink_capacities) else None
+        if incremental and capacities is not None and self.__solution is not None and \
+                self.__solution[0][0] is capacities[0] and self.__solution[0][1] is capacities[1] and \
+                self.__solution[1] == (backend, tree_solver):
+            solved = self.__solution[2]
+        maximum_flows = [None] * len(self.graphs)
+        indices = []
+        for index, graph in enumerate(self.graphs):
+            graph_solution = solved.get(id(graph))
+            if graph_solution is not None and graph_solution[0] is graph and graph_solution[1] == graph.edge_version:
+                maximum_flows[index] = graph_solution[2]
+            else:
+                indices.append(index)
+
+        for index, flows in zip(indices, self.__solve(indices, source_capacities, sink_capacities, processes, backend,
+                                                      tree_solver)):
+            maximum_flows[index] = flows
+
+        if incremental and capacities is not None:
+            self.__solution = (capacities, (backend, tree_solver), {id(graph): (graph, graph.edge_version, flows)
+                                                                  for graph, flows in zip(self.graphs, maximum_flows)})
+        return maximum_flows
+
+    def __solve(self, indices, source_capacities, sink_capacities, processes, backend, tree_solver):
+        """
+        Method computing the output of NetworkGraph.maximum_flows() of the graphs with the given indices, on a pool of
+        worker processes if processes is larger than 1 and there are at least MIN_PARALLEL_STEPS time steps to solve.
+        """
+        if processes > 1 and len(indices) * source_capacities.shape[0] >= MIN_PARALLEL_STEPS:
+            return self.__parallel_maximum_flows(indices, source_capacities, sink_capacities, processes, backend,
+                                                 tree_solver)
+
+        maximum_flows = []
+        for index in indices:
+            maximum_flows.append(self.graphs[index].maximum_flows(source_capacities[:, self.source_ids[index]],
+                                                                  sink_capacities[:, self.sink_ids[index]],
+                                                                  backend=backend, tree_solver=tree_solver))
+        return maximum_flows
+
+    def __parallel_maximum_flows(self, indices, source_capacities, sink_capacities, processes, backend, tree_solver):
+        """
+        Method computing the output of __solve() on a pool of worker processes. Each task consists of a graph, which is
+        pickled compactly, and the capacities of its sources and sinks in a chunk of time steps.
+        """
+        # a few tasks per process balance the load of large and small graphs
+        number_of_steps = source_capacities.shape[0]
+        number_of_chunks = max(1, min(number_of_steps, -(-4 * processes // len(indices))))
+        chunks = np.array_split(np.arange(number_of_steps), number_of_chunks)
+        tasks = [(self.graphs[index], source_capacities[chunk[:, None], self.source_ids[index]],
+                  sink_capacities[chunk[:, None], self.sink_ids[index]], backend, tree_solver)
+                 for index in indices for chunk in chunks]
+        pool = Pool(processes)
+        try:
+            results = pool.map(_maximum_flows_of_task, tasks)
+        finally:
+            pool.close()
+            pool.join()
+
+        # concatenate the chunks of time steps of every graph
+        maximum_flows = []
+        for first in range(0, len(results), number_of_chunks):
+            graph_results = results[first:first + number_of_chunks]
+            maximum_flows.append(tuple(np.concatenate([result[part] for result in graph_results], axis=0)
+                                       for part in range(3)))
         return maximum_flows
 
     def edge_source_target_vertices(self):
@@ -55,11 +228,26 @@ class NetworkGraphUnion:
         return edge_source_target_vertices
 
     def delete_edges(self, edges):
-        # TODO check runtime
-        for graph in self.graphs:
-            for edge in edges:
-                if graph.contains_vertices(edge):
-                    graph.delete_edges([edge])
+        """
+        Method deleting edges of the graphs in place. Each edge is assigned to its graph by the component index, hence
+        the runtime depends on the number of deleted edges only. Edges with vertices in different or no graphs are
+        ignored.
+
+        :param edges: list of tuples of source target vertices which edges will be deleted. Vertices may also be lists.
+        :type edges: list. [(("source", 1), ("source", 2)), (("source", 1), ("sink", 0)), ...]
+        :return:
+        """
+
+        edges_of_graph = {}
+        for source, target in edges:
+            source, target = tuple(source), tuple(target)
+            source_location = self.vertex_index.get(source)
+            target_location = self.vertex_index.get(target)
+            if source_location is not None and target_location is not None and \
+                    source_location[0] == target_location[0]:
+                edges_of_graph.setdefault(source_location[0], []).append((source, target))
+        for index, graph_edges in edges_of_graph.items():
+            self.graphs[index].delete_edges(graph_edges)
 
     def number_of_edges(self):
         number_of_edges = []
@@ -79,13 +267,20 @@ class NetworkGraphUnion:
             vertices.append(graph.vertices())
         return vertices
 
+    def vertex_types(self):
+        vertex_types = []
+        for graph in self.graphs:
+            vertex_types.append(graph.vertex_types())
+        return vertex_types
+
+    def vertex_ids(self):
+        vertex_ids = []
+        for graph in self.graphs:
+            vertex_ids.append(graph.vertex_ids())
+        return vertex_ids
+
     def contains_vertices(self, vertices):
         for vertex in vertices:
-            found = False
-            for graph in self.graphs:
-
-                if graph.contains_vertices([vertex]):
-                    found = True
-            if found is False:
+            if tuple(vertex) not in self.vertex_index:
                 return False
         return True
@@ -0,0 +1,108 @@
+"""
+Benchmark of the memory held by NetworkGraph objects. Run from the calculation module directory with
+
+    python -m excess_heat.graph.test.benchmark [number of sources]
+
+Only memory allocated by the Python interpreter is traced, hence the reported sizes contain the vertex mappings and
+attributes of the graphs but not the igraph core structures. The vertex ids of a NetworkGraph are stored in one int32
+array. The previous layout mapped vertices to source and sink ids and back in four dicts and stored the type, id and
+color of every vertex as igraph vertex attributes. These objects are rebuilt for the same graphs to compare both
+layouts.
+"""
+import sys
+import time
+import tracemalloc
+import numpy as np
+from ..graph import NetworkGraph
+from .test_graph import random_adjacency
+
+
+def dict_layout(graph):
+    """
+    function building the vertex mappings and vertex attributes the dict based layout held for a NetworkGraph.
+
+    :param graph: graph whose vertices are mapped.
+    :type graph: NetworkGraph.
+
+    :return: vertex to source, vertex to sink, source to vertex and sink to vertex dicts and the vertex attributes.
+    :rtype: tuple. (dict, dict, dict, dict, dict)
+    """
+    source_ids = graph.vertex_ids()[:graph.number_of_sources].tolist()
+    sink_ids = graph.vertex_ids()[graph.number_of_sources:].tolist()
+    vertex_to_source = dict(zip(range(graph.number_of_sources), source_ids))
+    vertex_to_sink = dict(zip(range(graph.number_of_sources, graph.number_of_vertices()), sink_ids))
+    source_to_vertex = {v: k for k, v in vertex_to_source.items()}
+    sink_to_vertex = {v: k for k, v in vertex_to_sink.items()}
+    # the correspondence nodes were colored like the sources or sinks they connect
+    vertex_attributes = {
+        "type": ["source"] * graph.number_of_sources + ["sink"] * graph.number_of_sinks,
+        "id": source_ids + sink_ids,
+        "color": ["red"] * (graph.number_of_sources + len(graph.connecting_node_of_source_correspondence)) +
+                 ["blue"] * (graph.number_of_sinks + len(graph.connecting_node_of_sink_correspondence))
+    }
+    return vertex_to_source, vertex_to_sink, source_to_vertex, sink_to_vertex, vertex_attributes
+
+
+def traced_size(build):
+    """
+    function returning the object built by a function and the traced bytes it holds.
+    """
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    return result, tracemalloc.get_traced_memory()[0] - before
+
+
+def measure_memory(number_of_sources, number_of_sinks, edges_per_vertex=2, seed=0):
+    """
+    function measuring the memory held by a NetworkGraph and by its connected components with the array and the dict
+    based vertex layout.
+
+    :param number_of_sources: number of sources.
+    :type number_of_sources: int.
+    :param number_of_sinks: number of sinks.
+    :type number_of_sinks: int.
+    :param edges_per_vertex: average number of random edges per source or sink.
+    :type edges_per_vertex: int.
+    :param seed: seed of the random generator.
+    :type seed: int.
+
+    :return: traced bytes held by the graph and by the components with the array layout, the same with the dict layout
+             and the construction time in seconds.
+    :rtype: tuple. ((int, int), (int, int), float)
+    """
+    source_sink = random_adjacency(number_of_sources, number_of_sinks, edges_per_vertex * number_of_sources, seed)
+    source_source = random_adjacency(number_of_sources, number_of_sources, edges_per_vertex * number_of_sources,
+                                     seed + 1, symmetric=True)
+    sink_sink = random_adjacency(number_of_sinks, number_of_sinks, edges_per_vertex * number_of_sinks, seed + 2,
+                                 symmetric=True)
+    random = np.random.RandomState(seed + 3)
+    source_correspondence = random.randint(0, number_of_sources, number_of_sources).tolist()
+    sink_correspondence = random.randint(0, number_of_sinks, number_of_sinks).tolist()
+
+    tracemalloc.start()
+    start = time.time()
+    graph, graph_memory = traced_size(lambda: NetworkGraph(source_sink, source_source, sink_sink,
+                                                           source_correspondence, sink_correspondence))
+    components, components_memory = traced_size(graph.decompose_to_connected)
+    duration = time.time() - start
+
+    # the dict layout holds the mappings and attributes instead of the id array
+    _, graph_mappings = traced_size(lambda: dict_layout(graph))
+    component_mappings = sum(traced_size(lambda: dict_layout(component))[1] for component in components)
+    tracemalloc.stop()
+    dict_graph_memory = graph_memory - graph.vertex_ids().nbytes + graph_mappings
+    dict_components_memory = components_memory - sum(component.vertex_ids().nbytes for component in components) + \
+        component_mappings
+
+    del graph, components
+    return (graph_memory, components_memory), (dict_graph_memory, dict_components_memory), duration
+
+
+if __name__ == "__main__":
+    number_of_sources = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    array_memory, dict_memory, duration = measure_memory(number_of_sources, 2 * number_of_sources)
+    print("sources: %d, sinks: %d" % (number_of_sources, 2 * number_of_sources))
+    for name, array_bytes, dict_bytes in zip(("graph", "components"), array_memory, dict_memory):
+        print("%s: %.1f MiB with dicts, %.1f MiB with id array, ratio %.1f" %
+              (name, dict_bytes / 2 ** 20, array_bytes / 2 ** 20, dict_bytes / array_bytes))
+    print("time: %.2f s" % duration)
@@ -1,6 +1,48 @@
+import os
+import pickle
+import resource
 import unittest
-from ..graph import NetworkGraph
+from ..graph import NetworkGraph, FLOW_RESOLUTION, _augmenting_path_flow, _integer_maximum_flow
 import numpy as np
+from scipy.sparse import csr_matrix, triu
+
+
+def random_adjacency(rows, columns, number_of_edges, seed, symmetric=False):
+    """
+    function generating a random sparse adjacency matrix.
+
+    :param rows: number of rows.
+    :type rows: int.
+    :param columns: number of columns.
+    :type columns: int.
+    :param number_of_edges: number of random entries before duplicates are removed.
+    :type number_of_edges: int.
+    :param seed: seed of the random generator.
+    :type seed: int.
+    :param symmetric: if True the matrix is made symmetric without diagonal entries.
+    :type symmetric: bool.
+
+    :return: adjacency matrix with random distances as entries.
+    :rtype: scipy csr_matrix.
+    """
+    random = np.random.RandomState(seed)
+    adjacency = csr_matrix((random.random_sample(number_of_edges) + 0.1,
+                            (random.randint(0, rows, number_of_edges), random.randint(0, columns, number_of_edges))),
+                           shape=(rows, columns))
+    adjacency.sum_duplicates()
+    if symmetric:
+        adjacency = triu(adjacency, 1)
+        adjacency = (adjacency + adjacency.T).tocsr()
+    return adjacency
+
+
+def resident_memory():
+    """
+    function returning the current resident memory of the process in KiB. Unlike the peak resident memory it is not
+    hidden by the memory used before.
+    """
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * resource.getpagesize() // 1024
 
 
 class TestNetworkGraph(unittest.TestCase):
@@ -57,6 +99,37 @@ class TestNetworkGraph(unittest.TestCase):
         with self.assertRaises(ValueError):
             graph.add_edge_attribute("distance", [], source_source_distances, sink_sink_distances)
 
+    def test_sparse_adjacency(self):
+        source_sink_edges = [[0], [0, 1], [1], [2], [3]]
+        source_source_edges = [[], [2], [], [], []]
+        sink_sink_edges = [[1], [], [], []]
+        source_sink_distances = [[5], [2, 3], [2], [6], [0]]
+        source_source_distances = [[], [1], [], [], []]
+        sink_sink_distances = [[4], [], [], []]
+        source_correspondence = [0, 1, 2, 3, 4]
+        sink_correspondence = [0, 0, 1, 2]
+
+        def to_sparse(edges, distances, shape):
+            indptr = np.cumsum([0] + [len(row) for row in edges])
+            return csr_matrix((np.array(sum(distances, []), dtype=np.float32),
+                               np.array(sum(edges, []), dtype=np.int32), indptr), shape=shape)
+
+        source_sink = to_sparse(source_sink_edges, source_sink_distances, (5, 4))
+        source_source = to_sparse(source_source_edges, source_source_distances, (5, 5))
+        sink_sink = to_sparse(sink_sink_edges, sink_sink_distances, (4, 4))
+
+        graph = NetworkGraph(source_sink_edges, source_source_edges, sink_sink_edges, source_correspondence,
+                             sink_correspondence)
+        graph.add_edge_attribute("distance", source_sink_distances, source_source_distances, sink_sink_distances)
+        sparse_graph = NetworkGraph(source_sink, source_source, sink_sink, source_correspondence, sink_correspondence)
+        sparse_graph.add_edge_attribute("distance", source_sink, source_source, sink_sink)
+
+        self.assertEqual(graph.number_of_sources, sparse_graph.number_of_sources)
+        self.assertEqual(graph.number_of_sinks, sparse_graph.number_of_sinks)
+        self.assertSequenceEqual(graph.edge_source_target_vertices(), sparse_graph.edge_source_target_vertices())
+        # the explicitly stored zero distance is an edge as well
+        self.assertSequenceEqual(graph.get_edge_attribute("distance"), sparse_graph.get_edge_attribute("distance"))
+
     def test_get_edge_attribute(self):
         source_sink_edges = [[0], [0, 1], [1], [2], [3]]
         source_source_edges = [[], [2], [], [], []]
@@ -143,6 +216,50 @@ class TestNetworkGraph(unittest.TestCase):
                                   (('source', 1), ('source', 2))],
                                  graph.edge_source_target_vertices())
 
+    def test_views(self):
+        source_sink_edges = [[0], [0, 1], [1], [2], [3]]
+        source_source_edges = [[], [2], [], [], []]
+        sink_sink_edges = [[], [], [], []]
+        source_correspondence = [0, 1, 2, 3, 4]
+        sink_correspondence = [0, 0, 1, 2]
+        graph = NetworkGraph(source_sink_edges, source_source_edges, sink_sink_edges, source_correspondence,
+                             sink_correspondence)
+
+        graph.delete_edges([(('source', 3), ('sink', 2)), (('source', 1), ('source', 2))])
+        graph_view = graph.graph
+        self.assertEqual(9, graph_view.vcount())
+        self.assertEqual(5, graph_view.ecount())
+        # one correspondence node connecting sink 0 and sink 1
+        correspondence_graph = graph.correspondence_graph
+        self.assertEqual(10, correspondence_graph.vcount())
+        self.assertEqual(7, correspondence_graph.ecount())
+        # five sources and three coherent sinks connected to the infinite source and sink
+        self.assertEqual(12, graph.max_flow_graph.vcount())
+        self.assertEqual(15, graph.max_flow_graph.ecount())
+        self.assertSequenceEqual(graph_view.get_edgelist(), graph.max_flow_graph.get_edgelist()[:5])
+
+        flow = graph.maximum_flow([1, 1, 1, 1, 1], [1, 1, 1, 1])
+        self.assertEqual(5, len(flow[2]))
+        # sink 2 is disconnected
+        self.assertAlmostEqual(3, np.sum(flow[1]), 3)
+
+    def test_correspondence_nodes(self):
+        source_sink_edges = [[0], [], [], []]
+        source_source_edges = [[], [], [], []]
+        sink_sink_edges = [[], [], []]
+        source_correspondence = [7, 3, 7, 3]
+        sink_correspondence = [0, 1, 0]
+        graph = NetworkGraph(source_sink_edges, source_source_edges, sink_sink_edges, source_correspondence,
+                             sink_correspondence)
+
+        # correspondence nodes in order of first appearance, sources before sinks
+        self.assertEqual({7: 7, 3: 8}, graph.connecting_node_of_source_correspondence)
+        self.assertEqual({0: 9}, graph.connecting_node_of_sink_correspondence)
+        self.assertSequenceEqual([(0, 4), (0, 7), (2, 7), (1, 8), (3, 8), (4, 9), (6, 9)],
+                                 graph.correspondence_graph.get_edgelist())
+        self.assertEqual(2, graph.number_of_coherent_sources)
+        self.assertEqual(2, graph.number_of_coherent_sinks)
+
     def test_number_of_edges(self):
         source_sink_edges = [[0], [0, 1], [1], [2], [3]]
         source_source_edges = [[], [2], [], [], []]
@@ -260,4 +377,283 @@ class TestNetworkGraph(unittest.TestCase):
         component = components[0].decompose_to_connected()
         self.assertEqual(component[0].edge_source_target_vertices(), components[0].edge_source_target_vertices())
 
+    def test_decomposition_coherent(self):
+        source_sink_edges = [[0], [1], [], []]
+        source_source_edges = [[], [], [], []]
+        sink_sink_edges = [[], [], [], []]
+        source_correspondence = [0, 1, 1, 2]
+        sink_correspondence = [0, 1, 1, 1]
+
+        graph = NetworkGraph(source_sink_edges, source_source_edges, sink_sink_edges, source_correspondence,
+                             sink_correspondence)
+
+        # coherent sources and sinks form one component, the single source 3 is discarded
+        components = graph.decompose_to_connected()
+        self.assertEqual(2, len(components))
+        self.assertSequenceEqual([('source', 1), ('source', 2), ('sink', 1), ('sink', 2), ('sink', 3)],
+                                 components[1].vertices())
+        self.assertSequenceEqual([(('source', 1), ('sink', 1))], components[1].edge_source_target_vertices())
+        self.assertEqual([1, 1], components[1].source_correspondence)
+        self.assertEqual([1, 1, 1], components[1].sink_correspondence)
+
+        flow = components[1].maximum_flow([1, 2], [1, 1, 4])
+        self.assertAlmostEqual(np.sum(flow[1]), 3, 3)
+
+    def test_vertex_arrays(self):
+        source_sink_edges = [[0], [0, 1], [1], [2], []]
+        source_source_edges = [[], [2], [1], [], []]
+        sink_sink_edges = [[], [], [], []]
+        source_correspondence = [0, 1, 2, 3, 4]
+        sink_correspondence = [0, 0, 1, 2]
+
+        graph = NetworkGraph(source_sink_edges, source_source_edges, sink_sink_edges, source_correspondence,
+                             sink_correspondence)
+        np.testing.assert_array_equal([0, 0, 0, 0, 0, 1, 1, 1, 1], graph.vertex_types())
+        np.testing.assert_array_equal([0, 1, 2, 3, 4, 0, 1, 2, 3], graph.vertex_ids())
+        self.assertEqual(np.int8, graph.vertex_types().dtype)
+        self.assertEqual(np.int32, graph.vertex_ids().dtype)
+        with self.assertRaises(ValueError):
+            graph.vertex_ids()[0] = 1
+
+        components = graph.decompose_to_connected()
+        np.testing.assert_array_equal([0, 0, 0, 1, 1], components[0].vertex_types())
+        np.testing.assert_array_equal([0, 1, 2, 0, 1], components[0].vertex_ids())
+        np.testing.assert_array_equal([0, 1], components[1].vertex_types())
+        np.testing.assert_array_equal([3, 2], components[1].vertex_ids())
 
+    def test_compact_vertices(self):
+        source_sink_edges = [[0], [0, 1], [1], [2], []]
+        source_source_edges = [[], [2], [1], [], []]
+        sink_sink_edges = [[], [], [], []]
+        source_correspondence = [0, 1, 2, 3, 4]
+        sink_correspondence = [0, 0, 1, 2]
+
+        graph = NetworkGraph(source_sink_edges, source_source_edges, sink_sink_edges, source_correspondence,
+                             sink_correspondence)
+        # no vertex attributes are stored in igraph
+        self.assertEqual([], graph.max_flow_graph.vs.attributes())
+
+        components = graph.decompose_to_connected()
+        self.assertTrue(components[1].contains_vertices([('source', 3), ('sink', 2)]))
+        self.assertFalse(components[1].contains_vertices([('source', 2)]))
+        with self.assertRaises(KeyError):
+            components[1].delete_edges([(('source', 3), ('sink', 1))])
+        components[1].delete_edges([(('sink', 2), ('source', 3))])
+        self.assertEqual(0, components[1].number_of_edges())
+
+    def test_maximum_flows(self):
+        # tree with coherent sinks 0 and 1
+        source_sink_edges = [[0], [1], [2]]
+        source_source_edges = [[], [2], []]
+        sink_sink_edges = [[], [], []]
+        source_correspondence = [0, 1, 2]
+        sink_correspondence = [0, 0, 1]
+        graph = NetworkGraph(source_sink_edges, source_source_edges, sink_sink_edges, source_correspondence,
+                             sink_correspondence)
+
+        # balanced, sink limited and source limited time steps
+        source_capacities = np.array([[1, 2, 3], [100, 100, 100], [5, 2, 3]])
+        sink_capacities = np.array([[1, 2, 3], [1, 4, 2], [100, 100, 100]])
+        # by default every time step is solved by the push relabel algorithm
+        flows = graph.maximum_flows(source_capacities, sink_capacities)
+        for step, (source_capacity, sink_capacity) in enumerate(zip(source_capacities, sink_capacities)):
+            for expected, actual in zip(graph._push_relabel_flow(source_capacity, sink_capacity), flows):
+                np.testing.assert_array_equal(expected, actual[step])
+
+        flows = graph.maximum_flows(source_capacities, sink_capacities, tree_solver=True)
+        self.assertEqual((3, 3), flows[0].shape)
+        self.assertEqual((3, 2), flows[1].shape)
+        self.assertEqual((3, 4), flows[2].shape)
+        for step, (source_capacity, sink_capacity) in enumerate(zip(source_capacities, sink_capacities)):
+            flow = graph._push_relabel_flow(source_capacity, sink_capacity)
+            self.assertAlmostEqual(np.sum(flow[0]), np.sum(flows[0][step]), 3)
+            self.assertAlmostEqual(np.sum(flow[1]), np.sum(flows[1][step]), 3)
+        # the flow of a balanced tree is unique
+        flow = graph._push_relabel_flow(source_capacities[0], sink_capacities[0])
+        for expected, actual in zip(flow, flows):
+            np.testing.assert_array_almost_equal(expected, actual[0])
+        # sources and sinks contribute in proportion to their capacity
+        np.testing.assert_array_almost_equal([5, 2], flows[1][1])
+        np.testing.assert_array_almost_equal([5, 2, 3], flows[0][2])
+
+        # graph with cycles is solved step by step
+        source_sink_edges = [[0], [0, 1], [1], [2], [3]]
+        source_source_edges = [[], [2], [], [], []]
+        sink_sink_edges = [[], [], [], []]
+        graph = NetworkGraph(source_sink_edges, source_source_edges, sink_sink_edges, [0, 1, 2, 3, 4], [0, 0, 1, 2])
+        flows = graph.maximum_flows([[100, 100, 100, 100, 100]], [[1, 4, 2, 3]])
+        self.assertAlmostEqual(10, np.sum(flows[1]), 3)
+        self.assertAlmostEqual(np.sum(flows[0]), np.sum(flows[1]), 3)
+        with self.assertRaises(TypeError):
+            graph.maximum_flows([100, 100, 100, 100, 100], [1, 4, 2, 3])
+
+        # graphs without sinks and time steps without capacities transport nothing
+        graph = NetworkGraph([[], []], [[1], []], [], [0, 1], [])
+        flow = graph._push_relabel_flow([1, 2], [])
+        self.assertSequenceEqual([(2,), (0,), (1,)], [part.shape for part in flow])
+        self.assertEqual(0, np.sum(np.abs(flow[0])))
+        graph = NetworkGraph([[0]], [[]], [[]], [0], [0])
+        for part in graph._push_relabel_flow([0], [0]):
+            np.testing.assert_array_equal([0], part)
+
+    def test_tree_flow_solver(self):
+        random = np.random.RandomState(0)
+        for _ in range(20):
+            # random tree of sources and sinks
+            number_of_sources, number_of_sinks = random.randint(2, 8), random.randint(1, 8)
+            source_sink_edges = [[] for _ in range(number_of_sources)]
+            source_source_edges = [[] for _ in range(number_of_sources)]
+            sink_sink_edges = [[] for _ in range(number_of_sinks)]
+            vertices = random.permutation(number_of_sources + number_of_sinks)
+            for i in range(1, vertices.shape[0]):
+                vertex1, vertex2 = sorted((vertices[i], vertices[random.randint(0, i)]))
+                if vertex2 < number_of_sources:
+                    source_source_edges[vertex1].append(vertex2)
+                elif vertex1 < number_of_sources:
+                    source_sink_edges[vertex1].append(vertex2 - number_of_sources)
+                else:
+                    sink_sink_edges[vertex1 - number_of_sources].append(vertex2 - number_of_sources)
+            graph = NetworkGraph(source_sink_edges, source_source_edges, sink_sink_edges,
+                                 list(range(number_of_sources)), list(range(number_of_sinks)))
+            self.assertTrue(graph._flow_forest())
+
+            # the total flows are the ones of the push relabel algorithm, also after splitting the tree
+            for _ in range(2):
+                source_capacities = random.uniform(0, 10, number_of_sources)
+                sink_capacities = random.uniform(0, 10, number_of_sinks)
+                flow = graph.maximum_flow(source_capacities, sink_capacities, tree_solver=True)
+                expected = graph._push_relabel_flow(source_capacities, sink_capacities)
+                self.assertAlmostEqual(np.sum(expected[0]), np.sum(flow[0]), 6)
+                self.assertAlmostEqual(np.sum(expected[1]), np.sum(flow[1]), 6)
+                self.assertEqual(len(expected[2]), len(flow[2]))
+                graph.delete_edges(graph.edge_source_target_vertices()[:1])
+
+        # graphs with cycles use the push relabel algorithm until they are reduced to a tree
+        source_sink_edges = [[0], [0, 1], [1], [2], [3]]
+        source_source_edges = [[], [2], [], [], []]
+        sink_sink_edges = [[], [], [], []]
+        graph = NetworkGraph(source_sink_edges, source_source_edges, sink_sink_edges, [0, 1, 2, 3, 4], [0, 1, 2, 3])
+        graph.add_edge_attribute("distance", [[1], [1, 1], [1], [1], [1]], [[], [1], [], [], []], [[], [], [], []])
+        flow = graph.maximum_flow([1, 1, 1, 1, 1], [1, 1, 1, 1], tree_solver=True)
+        self.assertFalse(graph._flow_forest())
+        self.assertAlmostEqual(4, np.sum(flow[1]), 3)
+        graph.reduce_to_minimum_spanning_tree("distance")
+        self.assertTrue(graph._flow_forest())
+        flow = graph.maximum_flow([1, 1, 1, 1, 1], [1, 1, 1, 1], tree_solver=True)
+        self.assertAlmostEqual(4, np.sum(flow[1]), 3)
+
+    def test_tree_flow_split(self):
+        # two sources supplying the same sinks contribute in proportion to their capacity
+        graph = NetworkGraph([[0], [0]], [[], []], [[1], []], [0, 1], [0, 1])
+        self.assertTrue(graph._flow_forest())
+        source_flow, sink_flow, connection_flow = graph.maximum_flow([3, 1], [1, 1], tree_solver=True)
+        np.testing.assert_allclose([1.5, 0.5], source_flow)
+        np.testing.assert_allclose([1, 1], sink_flow)
+        np.testing.assert_allclose([1.5, 0.5, 1], connection_flow)
+        # the push relabel algorithm used by default may leave edges without flow
+        for expected, actual in zip(graph._push_relabel_flow([3, 1], [1, 1]), graph.maximum_flow([3, 1], [1, 1])):
+            np.testing.assert_array_equal(expected, actual)
+
+        # a source supplying several sinks serves them in proportion to their demand
+        graph = NetworkGraph([[0, 1]], [[]], [[], []], [0], [0, 1])
+        source_flow, sink_flow, connection_flow = graph.maximum_flow([1], [3, 1], tree_solver=True)
+        np.testing.assert_allclose([1], source_flow)
+        np.testing.assert_allclose([0.75, 0.25], sink_flow)
+        np.testing.assert_allclose([0.75, 0.25], connection_flow)
+
+    def test_pickle(self):
+        source_sink_edges = [[0], [0, 1], [1], [2], [3]]
+        source_source_edges = [[], [2], [], [], []]
+        sink_sink_edges = [[], [], [], []]
+        graph = NetworkGraph(source_sink_edges, source_source_edges, sink_sink_edges, [0, 1, 2, 3, 4], [0, 0, 1, 2])
+        graph.add_edge_attribute("distance", [[1], [2, 3], [4], [5], [6]], [[], [7], [], [], []], [[], [], [], []])
+        flow = graph.maximum_flow([100, 100, 100, 100, 100], [1, 4, 2, 3])
+
+        copy = pickle.loads(pickle.dumps(graph))
+        self.assertEqual(graph.edge_store.get_edgelist(), copy.edge_store.get_edgelist())
+        self.assertSequenceEqual(graph.get_edge_attribute("distance"), copy.get_edge_attribute("distance"))
+        self.assertSequenceEqual(graph.vertices(), copy.vertices())
+        for expected, actual in zip(flow, copy.maximum_flow([100, 100, 100, 100, 100], [1, 4, 2, 3])):
+            np.testing.assert_array_almost_equal(expected, actual)
+
+    def test_max_flow_backends(self):
+        source_sink_edges = [[0], [0, 1], [1], [2], [3]]
+        source_source_edges = [[], [2], [], [], []]
+        sink_sink_edges = [[], [], [], []]
+        graph = NetworkGraph(source_sink_edges, source_source_edges, sink_sink_edges, [0, 1, 2, 3, 4], [0, 0, 1, 2])
+
+        for source_capacities, sink_capacities in (([100, 100, 100, 100, 100], [1, 4, 2, 3]),
+                                                   ([5, 2, 3, 1, 1], [100, 100, 100, 100])):
+            expected = graph.maximum_flow(source_capacities, sink_capacities, backend="igraph")
+            flow = graph.maximum_flow(source_capacities, sink_capacities, backend="csgraph")
+            self.assertAlmostEqual(np.sum(expected[0]), np.sum(flow[0]), 3)
+            self.assertAlmostEqual(np.sum(expected[1]), np.sum(flow[1]), 3)
+            self.assertEqual(len(expected[2]), len(flow[2]))
+        with self.assertRaises(ValueError):
+            graph.maximum_flow([1, 1, 1, 1, 1], [1, 1, 1, 1], backend="unknown")
+
+        # the augmenting path solver replacing scipy before version 1.4 finds flows of the same value
+        random = np.random.RandomState(0)
+        for _ in range(20):
+            edges = random.randint(0, 10, (30, 2))
+            capacities = random.randint(0, 100, 30)
+            for flow in (_augmenting_path_flow(edges, capacities, 0, 9, 10),
+                         _integer_maximum_flow(edges, capacities, 0, 9, 10)):
+                self.assertTrue(np.all(np.abs(flow) <= capacities))
+                net_flow = np.zeros(10)
+                np.add.at(net_flow, edges[:, 0], -flow)
+                np.add.at(net_flow, edges[:, 1], flow)
+                np.testing.assert_array_almost_equal(np.zeros(8), net_flow[1:9])
+            self.assertAlmostEqual(np.sum(_augmenting_path_flow(edges, capacities, 0, 9, 10)[edges[:, 0] == 0]) -
+                                   np.sum(_augmenting_path_flow(edges, capacities, 0, 9, 10)[edges[:, 1] == 0]),
+                                   np.sum(_integer_maximum_flow(edges, capacities, 0, 9, 10)[edges[:, 0] == 0]) -
+                                   np.sum(_integer_maximum_flow(edges, capacities, 0, 9, 10)[edges[:, 1] == 0]))
+
+        # the capacities of 200 unrestricted parallel edges exceed int32
+        edges = np.array([[0, 1]] * 200 + [[1, 2]])
+        capacities = np.array([FLOW_RESOLUTION] * 200 + [1000])
+        flow = _integer_maximum_flow(edges, capacities, 0, 2, 3)
+        np.testing.assert_array_almost_equal(np.full(200, 5.), flow[:200])
+        self.assertAlmostEqual(1000, flow[200])
+
+    @unittest.skipUnless(os.path.exists("/proc/self/statm"), "requires /proc/self/statm")
+    def test_max_flow_memory(self):
+        # graph with cycles, hence not solved analytically
+        graph = NetworkGraph(random_adjacency(30, 60, 60, 0), random_adjacency(30, 30, 30, 1, symmetric=True),
+                             random_adjacency(60, 60, 60, 2, symmetric=True), list(range(30)), list(range(60)))
+        self.assertFalse(graph._flow_forest())
+        random = np.random.RandomState(0)
+        source_capacities = random.uniform(0, 10, (2100, 30))
+        sink_capacities = random.uniform(0, 10, (2100, 60))
+        edges = np.array(graph.max_flow_graph.get_edgelist())
+        capacities = random.randint(0, 1000, edges.shape[0])
+
+        # the resident memory must not grow with the number of solves after a warm up
+        for source_capacity, sink_capacity in zip(source_capacities[:100], sink_capacities[:100]):
+            graph.maximum_flow(source_capacity, sink_capacity, backend="csgraph")
+        for _ in range(10):
+            _augmenting_path_flow(edges, capacities, graph.infinite_source_vertex, graph.infinite_sink_vertex,
+                                  graph.max_flow_graph.vcount())
+        memory = resident_memory()
+        for source_capacity, sink_capacity in zip(source_capacities[100:], sink_capacities[100:]):
+            graph.maximum_flow(source_capacity, sink_capacity, backend="csgraph")
+        for _ in range(100):
+            _augmenting_path_flow(edges, capacities, graph.infinite_source_vertex, graph.infinite_sink_vertex,
+                                  graph.max_flow_graph.vcount())
+        self.assertLess(resident_memory() - memory, 4096)
+
+    @unittest.skipUnless(os.path.exists("/proc/self/statm"), "requires /proc/self/statm")
+    def test_igraph_max_flow_memory(self):
+        # python-igraph 0.7 leaks about 8 * (vertices + edges) bytes per maximum flow, later versions do not leak
+        graph = NetworkGraph(random_adjacency(30, 60, 60, 0), random_adjacency(30, 30, 30, 1, symmetric=True),
+                             random_adjacency(60, 60, 60, 2, symmetric=True), list(range(30)), list(range(60)))
+        random = np.random.RandomState(0)
+        source_capacities = random.uniform(0, 10, (2100, 30))
+        sink_capacities = random.uniform(0, 10, (2100, 60))
+        for source_capacity, sink_capacity in zip(source_capacities[:100], sink_capacities[:100]):
+            graph.maximum_flow(source_capacity, sink_capacity, backend="igraph")
+        memory = resident_memory()
+        for source_capacity, sink_capacity in zip(source_capacities[100:], sink_capacities[100:]):
+            graph.maximum_flow(source_capacity, sink_capacity, backend="igraph")
+        leak = 8 * (graph.max_flow_graph.vcount() + graph.max_flow_graph.ecount()) * 2000 // 1024
+        self.assertLess(resident_memory() - memory, leak + 4096)
@@ -1,6 +1,8 @@
 import unittest
+from unittest import mock
 import numpy as np
-from ..graph_union import NetworkGraphUnion
+from .. import graph_union
+from ..graph_union import NetworkGraphUnion, MIN_PARALLEL_STEPS
 
 
 class TestNetworkGraph(unittest.TestCase):
@@ -354,3 +356,199 @@ class TestNetworkGraph(unittest.TestCase):
         self.assertTrue(graph.contains_vertices([('source', 0)]))
         self.assertTrue(graph.contains_vertices([('source', 0), ('sink', 2)]))
         self.assertFalse(graph.contains_vertices([('source', 7), ('sink', 2)]))
+
+    def test_delete_edges_batch_split(self):
+        source_sink_edges = [[0], [0, 1], [1], [2], []]
+        source_source_edges = [[], [2], [], [], []]
+        sink_sink_edges = [[], [], [], []]
+        source_correspondence = [0, 1, 2, 3, 4]
+        sink_correspondence = [0, 0, 1, 2]
+        graph = NetworkGraphUnion(source_sink_edges, source_source_edges, sink_sink_edges, source_correspondence,
+                                  sink_correspondence)
+        graph.decompose_to_connected()
+
+        # edges of several graphs are deleted at once, edges between graphs or of unknown vertices are ignored
+        graph.delete_edges([(('source', 1), ('sink', 1)), (('source', 3), ('sink', 2)), (('source', 0), ('sink', 2)),
+                            (('source', 7), ('sink', 0))])
+        self.assertSequenceEqual([[(('source', 0), ('sink', 0)), (('source', 1), ('source', 2)),
+                                   (('source', 1), ('sink', 0)), (('source', 2), ('sink', 1))], []],
+                                 graph.edge_source_target_vertices())
+
+        # cached flow capacities remain valid after the deletion
+        flow = graph.maximum_flow([100, 100, 100, 100, 100], [1, 4, 2, 3])
+        self.assertAlmostEqual(np.sum(flow[0][1]), 5, 3)
+        self.assertEqual(len(flow[0][2]), 4)
+        self.assertAlmostEqual(np.sum(flow[1][1]), 0, 3)
+
+    def test_delete_edges_list_vertices(self):
+        source_sink_edges = [[0], [0, 1], [1], [2], []]
+        source_source_edges = [[], [2], [], [], []]
+        sink_sink_edges = [[], [], [], []]
+        source_correspondence = [0, 1, 2, 3, 4]
+        sink_correspondence = [0, 0, 1, 2]
+        graph = NetworkGraphUnion(source_sink_edges, source_source_edges, sink_sink_edges, source_correspondence,
+                                  sink_correspondence)
+        graph.decompose_to_connected()
+
+        # vertices given as lists, e.g. parsed from JSON, are treated like tuples
+        self.assertTrue(graph.contains_vertices([["source", 3], ["sink", 2]]))
+        self.assertEqual(graph.locate_vertex(("sink", 2)), graph.locate_vertex(["sink", 2]))
+        graph.delete_edges([[["source", 3], ["sink", 2]], (["source", 1], ("source", 2))])
+        self.assertSequenceEqual([[(('source', 0), ('sink', 0)), (('source', 1), ('sink', 0)),
+                                   (('source', 1), ('sink', 1)), (('source', 2), ('sink', 1))], []],
+                                 graph.edge_source_target_vertices())
+
+    def test_locate_vertex_split(self):
+        source_sink_edges = [[0], [0, 1], [1], [2], []]
+        source_source_edges = [[], [2], [], [], []]
+        sink_sink_edges = [[], [], [], []]
+        source_correspondence = [0, 1, 2, 3, 4]
+        sink_correspondence = [0, 0, 1, 2]
+        graph = NetworkGraphUnion(source_sink_edges, source_source_edges, sink_sink_edges, source_correspondence,
+                                  sink_correspondence)
+        self.assertEqual((0, 6), graph.locate_vertex(('sink', 1)))
+        graph.decompose_to_connected()
+
+        self.assertEqual((0, 4), graph.locate_vertex(('sink', 1)))
+        self.assertEqual((1, 0), graph.locate_vertex(('source', 3)))
+        self.assertEqual((1, 1), graph.locate_vertex(('sink', 2)))
+        self.assertIsNone(graph.locate_vertex(('source', 4)))
+
+    def test_decompose_to_minimum_spanning_trees(self):
+        source_sink_edges = [[0], [0, 1], [1], [2], []]
+        source_source_edges = [[], [2], [1], [], []]
+        sink_sink_edges = [[], [], [], []]
+        source_correspondence = [0, 1, 2, 3, 4]
+        sink_correspondence = [0, 0, 1, 2]
+        source_sink_distances = [[5], [2, 3], [2], [6], []]
+        source_source_distances = [[], [1], [1], [], []]
+        sink_sink_distances = [[], [], [], []]
+
+        graph = NetworkGraphUnion(source_sink_edges, source_source_edges, sink_sink_edges, source_correspondence,
+                                  sink_correspondence, edge_attributes=[("distance", source_sink_distances,
+                                                                         source_source_distances,
+                                                                         sink_sink_distances)])
+        graph.decompose_to_minimum_spanning_trees("distance")
+        self.assertSequenceEqual([[(('source', 0), ('sink', 0)), (('source', 1), ('source', 2)),
+                                  (('source', 2), ('sink', 1))], [(('source', 3), ('sink', 2))]],
+                                 graph.edge_source_target_vertices())
+        self.assertSequenceEqual([[5, 1, 2], [6]], graph.get_edge_attribute("distance"))
+        self.assertEqual((1, 1), graph.locate_vertex(('sink', 2)))
+        self.assertSequenceEqual([0, 0], graph.graphs[0].sink_correspondence)
+
+    def test_maximum_flows_split(self):
+        source_sink_edges = [[0], [0, 1], [1], [2], []]
+        source_source_edges = [[], [2], [1], [], []]
+        sink_sink_edges = [[], [], [], []]
+        source_correspondence = [0, 1, 2, 3, 4]
+        sink_correspondence = [0, 0, 1, 2]
+        source_sink_distances = [[5], [2, 3], [2], [6], []]
+        source_source_distances = [[], [1], [1], [], []]
+        sink_sink_distances = [[], [], [], []]
+
+        graph = NetworkGraphUnion(source_sink_edges, source_source_edges, sink_sink_edges, source_correspondence,
+                                  sink_correspondence, edge_attributes=[("distance", source_sink_distances,
+                                                                         source_source_distances,
+                                                                         sink_sink_distances)])
+        graph.decompose_to_minimum_spanning_trees("distance")
+
+        source_capacities = np.array([[100, 100, 100, 100, 100], [5, 2, 3, 1, 1]])
+        sink_capacities = np.array([[1, 4, 2, 3], [100, 100, 100, 100]])
+        flows = graph.maximum_flows(source_capacities, sink_capacities)
+        self.assertEqual(2, len(flows))
+        for step, (source_capacity, sink_capacity) in enumerate(zip(source_capacities, sink_capacities)):
+            flow = graph.maximum_flow(source_capacity, sink_capacity)
+            for expected, actual in zip(flow, flows):
+                self.assertEqual(len(expected[2]), actual[2].shape[1])
+                self.assertAlmostEqual(np.sum(expected[0]), np.sum(actual[0][step]), 3)
+                self.assertAlmostEqual(np.sum(expected[1]), np.sum(actual[1][step]), 3)
+        self.assertAlmostEqual(5, np.sum(flows[0][1][0]), 3)
+        self.assertAlmostEqual(1, np.sum(flows[1][1][1]), 3)
+
+    def test_maximum_flows_parallel(self):
+        source_sink_edges = [[0], [0, 1], [1], [2], []]
+        source_source_edges = [[], [2], [1], [], []]
+        sink_sink_edges = [[], [], [], []]
+        source_correspondence = [0, 1, 2, 3, 4]
+        sink_correspondence = [0, 0, 1, 2]
+
+        graph = NetworkGraphUnion(source_sink_edges, source_source_edges, sink_sink_edges, source_correspondence,
+                                  sink_correspondence)
+        graph.decompose_to_connected()
+
+        # enough time steps of the two graphs to use the worker processes
+        random = np.random.RandomState(0)
+        source_capacities = random.uniform(0, 10, (MIN_PARALLEL_STEPS // 2, 5))
+        sink_capacities = random.uniform(0, 10, (MIN_PARALLEL_STEPS // 2, 4))
+        for tree_solver in (False, True):
+            expected = graph.maximum_flows(source_capacities, sink_capacities, tree_solver=tree_solver)
+            flows = graph.maximum_flows(source_capacities, sink_capacities, processes=2, tree_solver=tree_solver)
+            self.assertEqual(len(expected), len(flows))
+            for expected_flow, flow in zip(expected, flows):
+                for expected_part, part in zip(expected_flow, flow):
+                    self.assertEqual(expected_part.shape, part.shape)
+                    np.testing.assert_array_almost_equal(expected_part, part)
+
+        # fewer time steps are solved without starting worker processes
+        with mock.patch.object(graph_union, "Pool", side_effect=AssertionError("pool started")):
+            flows = graph.maximum_flows(source_capacities[:7], sink_capacities[:7], processes=2, tree_solver=True)
+        np.testing.assert_array_almost_equal(expected[0][2][:7], flows[0][2])
+
+    def test_maximum_flows_incremental(self):
+        source_sink_edges = [[0], [0, 1], [1], [2], []]
+        source_source_edges = [[], [2], [1], [], []]
+        sink_sink_edges = [[], [], [], []]
+        source_correspondence = [0, 1, 2, 3, 4]
+        sink_correspondence = [0, 0, 1, 2]
+        source_sink_distances = [[5], [2, 3], [2], [6], []]
+        source_source_distances = [[], [1], [1], [], []]
+        sink_sink_distances = [[], [], [], []]
+
+        graph = NetworkGraphUnion(source_sink_edges, source_source_edges, sink_sink_edges, source_correspondence,
+                                  sink_correspondence, edge_attributes=[("distance", source_sink_distances,
+                                                                         source_source_distances,
+                                                                         sink_sink_distances)])
+        graph.decompose_to_minimum_spanning_trees("distance")
+
+        source_capacities = np.array([[100, 100, 100, 100, 100], [5, 2, 3, 1, 1]])
+        sink_capacities = np.array([[1, 4, 2, 3], [100, 100, 100, 100]])
+        source_capacities.setflags(write=False)
+        sink_capacities.setflags(write=False)
+        flows = graph.maximum_flows(source_capacities, sink_capacities, incremental=True)
+
+        # only the graph split by the deleted edge is solved again
+        graph.delete_edges([(('source', 1), ('source', 2))])
+        updated_flows = graph.maximum_flows(source_capacities, sink_capacities, incremental=True)
+        self.assertIs(flows[1], updated_flows[1])
+        self.assertIsNot(flows[0], updated_flows[0])
+        expected = graph.maximum_flows(source_capacities, sink_capacities)
+        for expected_flow, flow in zip(expected, updated_flows):
+            for expected_part, part in zip(expected_flow, flow):
+                np.testing.assert_array_almost_equal(expected_part, part)
+        self.assertEqual(2, updated_flows[0][2].shape[1])
+
+        # read-only capacities are compared by identity, hence other arrays, writable capacities or other backends are
+        # solved from scratch
+        flows = graph.maximum_flows(source_capacities, sink_capacities, incremental=True)
+        self.assertIs(updated_flows[1], flows[1])
+        flows = graph.maximum_flows(source_capacities.copy(), sink_capacities, incremental=True)
+        self.assertIsNot(updated_flows[1], flows[1])
+        updated_flows = flows
+        source_capacities = source_capacities.copy()
+        source_capacities[1, 3] = 7
+        flows = graph.maximum_flows(source_capacities, sink_capacities, incremental=True)
+        self.assertIsNot(updated_flows[1], flows[1])
+        updated_flows = flows
+        flows = graph.maximum_flows(source_capacities, sink_capacities, incremental=True)
+        self.assertIsNot(updated_flows[1], flows[1])
+        source_capacities.setflags(write=False)
+        flows = graph.maximum_flows(source_capacities, sink_capacities, incremental=True)
+        expected = graph.maximum_flows(source_capacities, sink_capacities)
+        for expected_flow, flow in zip(expected, flows):
+            for expected_part, part in zip(expected_flow, flow):
+                np.testing.assert_array_almost_equal(expected_part, part)
+        self.assertIsNot(flows[1], graph.maximum_flows(source_capacities, sink_capacities, backend="csgraph",
+                                                       incremental=True)[1])
+        flows = graph.maximum_flows(source_capacities, sink_capacities, incremental=True)
+        self.assertIsNot(flows[1], graph.maximum_flows(source_capacities, sink_capacities, incremental=True,
+                                                       tree_solver=True)[1])
@@ -39,6 +39,17 @@ TIME_RESOLUTION_MAP = {"hour": 1, "day": 10, "week": 146, "month": 730, "year":
 # time units to average to account for thermal inertia of the system
 CONVOLUTION_MAP = {"hour": 6, "day": 1, "week": 1, "month": 1, "year": 1}
 
+# solver of the maximum flow of the networks, see TREE_FLOW_SOLVER for networks reduced to trees. "igraph" 0.7 leaks
+# about 8 * (vertices + edges) bytes per solved time step, i.e. about 70 MB per year of hourly steps of a network with
+# 1000 vertices plus edges, which accumulates in long running workers (test_igraph_max_flow_memory bounds the growth).
+# "csgraph" does not leak but rounds the capacities to integers and needs scipy >= 1.4 for maximum_flow, otherwise it
+# falls back to a much slower augmenting path solver.
+MAX_FLOW_BACKEND = "igraph"
+# solve networks reduced to trees analytically for all time steps at once instead of by the max flow backend. The total
+# flows are the same, but the flow is split among the sources and sinks in proportion to their capacity, hence the flow
+# through individual lines, and with it the line and pump costs and heat losses, differ from the backend.
+TREE_FLOW_SOLVER = False
+
 # electricity price used for pumps in ct/kWh
 ELECTRICITY_PRICE_MAP = {'BE': 24, 'BG': 10.8, 'CZ': 17.8, 'DK': 18.9, 'DE': 22.5, 'EE': 11.9, 'IE': 20.7,
                          'EL': 17.4, 'ES': 26.5, 'FR': 15.6, 'HR': 13.2, 'IT': 22, 'CY': 18.1, 'LV': 19, 'LT': 12.1,
@@ -11,11 +11,15 @@ from pyproj import Proj, Transformer
 from shapely.geometry import Point, Polygon, MultiPolygon
 from shapely.wkb import loads
 from skimage import measure
-from scipy.ndimage import center_of_mass
+from scipy.ndimage import center_of_mass, minimum
 import numpy as np
 import json as json_lib
 from scipy.stats import mode
 
+# building a transformer is expensive, hence they are only built once
+LAEA_TO_WGS84_TRANSFORMER = Transformer.from_proj(Proj(init='epsg:3035'), Proj(init='epsg:4326'))
+WGS84_TO_LAEA_TRANSFORMER = Transformer.from_proj(Proj(init='epsg:4326'), Proj(init='epsg:3035'))
+
 
 def ad_nuts_id():
     path = os.path.dirname(
@@ -41,44 +45,36 @@ def ad_tuw23v2(dh_areas, hdm, nuts_id):
 
     all_labels, labels = measure.label(dh_areas, return_num=True)
 
-    distance = 20
-    in_proj = Proj(init='epsg:3035')
-    out_proj = Proj(init='epsg:4326')
-    transformer = Transformer.from_proj(in_proj, out_proj)
-    data = []
-
-    center_points = center_of_mass(all_labels.astype(bool).astype(int), labels=all_labels, index=1 + np.arange(labels))
-    for label in range(1, labels + 1):
-        ind = all_labels == label
-        xs, ys = np.where(ind != 0)
-        min_xs = min(xs)
-        max_xs = max(xs)
-        min_ys = min(ys)
-        max_ys = max(ys)
-        dh_area = all_labels * ind
-        nuts_id_m = nuts_id_raster * ind
-        dh_area = dh_area[min_xs:max_xs + 1, min_ys:max_ys + 1].astype(bool)
-        nuts_id_m = nuts_id_m[min_xs:max_xs + 1, min_ys:max_ys + 1]
-        nuts_id_m = nuts_id_m.flatten()
-        nuts = np.unique(nuts_id_m, return_counts=True)[0]
-        if len(nuts) > 1:
-            if nuts[0] == 0:
-                nuts = nuts[1]
-            else:
-                nuts = nuts[0]
-        else:
-            nuts = nuts[0]
-        nuts2_id = nuts_id_map[nuts_id_map["id"] == nuts].values[0][1][0:4]
-        heat_demand = np.sum(dh_area * hdm[min_xs:max_xs + 1, min_ys:max_ys + 1])
-        # label start from 1 but center point index should start from 0
-        coordinate = center_points[label-1]
-
-        lon = root_coordinate[0] + coordinate[1] * 100
-        lat = root_coordinate[1] - coordinate[0] * 100
-        lon, lat = transformer.transform(lon, lat)
-        data.append([lon, lat, heat_demand, label, nuts2_id])
-
-    data = pd.DataFrame(data, columns=["Lon", "Lat", "Heat_demand", "id", "Nuts2_ID"])
+    label_index = 1 + np.arange(labels)
+    center_points = center_of_mass(all_labels.astype(bool).astype(int), labels=all_labels, index=label_index)
+
+    # heat demand of every label in a single pass over the raster. Index 0 is the background.
+    heat_demand = np.bincount(all_labels.ravel(), weights=hdm.ravel(), minlength=labels + 1)[1:].astype(hdm.dtype)
+
+    # every label gets the smallest nuts id != 0 within the label or 0 if there is none
+    nuts_id_raster = nuts_id_raster.astype(np.int64)
+    no_nuts_id = nuts_id_raster.max() + 1
+    nuts = np.asarray(minimum(np.where(nuts_id_raster == 0, no_nuts_id, nuts_id_raster), labels=all_labels,
+                              index=label_index), dtype=np.int64).reshape(-1)
+    nuts[nuts == no_nuts_id] = 0
+    # the first entry of the nuts id map is used for every id
+    nuts_id_to_nuts2_id = {}
+    for nuts_id_, nuts_name in zip(nuts_id_map["id"].values[::-1], nuts_id_map.iloc[::-1, 1].values):
+        nuts_id_to_nuts2_id[nuts_id_] = nuts_name[0:4]
+    nuts2_id = [nuts_id_to_nuts2_id[nuts_id_] for nuts_id_ in nuts]
+
+    data = pd.DataFrame({"Heat_demand": heat_demand, "id": label_index, "Nuts2_ID": nuts2_id},
+                        columns=["Heat_demand", "id", "Nuts2_ID"])
+    # label start from 1 but center point index should start from 0, hence the center points are in label order.
+    # The projected coordinates in m are kept for the neighbour search.
+    center_points = np.array(center_points, dtype=float).reshape(-1, 2)
+    x = root_coordinate[0] + center_points[:, 1] * 100
+    y = root_coordinate[1] - center_points[:, 0] * 100
+    lon, lat = LAEA_TO_WGS84_TRANSFORMER.transform(x, y)
+    data.insert(0, "Lon", lon)
+    data.insert(1, "Lat", lat)
+    data.insert(2, "X", x)
+    data.insert(3, "Y", y)
 
     data["ellipsoid"] = "SRID=4326"
     data["Economic_Activity"] = "Steam and air conditioning supply"
@@ -102,9 +98,7 @@ def ad_tuw23v2_old(dh_areas, hdm, nuts_id):
     all_labels, labels = measure.label(dh_areas, return_num=True)
 
     distance = 20
-    in_proj = Proj(init='epsg:3035')
-    out_proj = Proj(init='epsg:4326')
-    transformer = Transformer.from_proj(in_proj, out_proj)
+    transformer = LAEA_TO_WGS84_TRANSFORMER
     data = []
     for label in range(1, labels+1):
         ind = all_labels == label
@@ -250,9 +244,7 @@ def ad_tuw23(out_shp_label, nuts2_id, spatial_resolution):
         coherent_areas = fiona.open(out_shp_label)
     except IOError:
         return -1
-    in_proj = Proj(init='epsg:3035')
-    out_proj = Proj(init='epsg:4326')
-    transformer = Transformer.from_proj(in_proj, out_proj)
+    transformer = LAEA_TO_WGS84_TRANSFORMER
 
     coherent_areas_transformed = []
     for coherent_area in coherent_areas:
@@ -502,4 +494,9 @@ def ad_industrial_database_local(nuts2_ids, industrial_database_excess_heat):
                                            site["Nuts2_ID"])
     data["id"] = range(data.shape[0])
 
+    # projected coordinates in m for the neighbour search
+    x, y = WGS84_TO_LAEA_TRANSFORMER.transform(data["Lon"].values.astype(float), data["Lat"].values.astype(float))
+    data["X"] = x
+    data["Y"] = y
+
     return data
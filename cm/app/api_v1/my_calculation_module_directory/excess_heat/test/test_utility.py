@@ -0,0 +1,213 @@
+import unittest
+import numpy as np
+import pandas as pd
+from ..utility import (find_neighbours, find_neighbours_symmetric, temp_check, temp_mask, orthodrome_distance,
+                       haversine_distance, vincenty_distance, distance_matrix)
+
+
+def random_sites(number_of_sites, seed):
+    random = np.random.RandomState(seed)
+    return pd.DataFrame({"Lon": random.uniform(10, 11, number_of_sites), "Lat": random.uniform(47, 48, number_of_sites),
+                         "Temperature": random.choice([100, 150, 350], number_of_sites),
+                         "id": range(number_of_sites)})
+
+
+class TestFindNeighbours(unittest.TestCase):
+
+    def test_kdtree(self):
+        sites1 = random_sites(60, 0)
+        sites2 = random_sites(80, 1)
+
+        connections, distances = find_neighbours(sites1, sites2, 20000)
+        kdtree_connections, kdtree_distances = find_neighbours(sites1, sites2, 20000, method="kdtree")
+        self.assertSequenceEqual(connections, kdtree_connections)
+        for row, kdtree_row in zip(distances, kdtree_distances):
+            np.testing.assert_allclose(row, kdtree_row)
+
+        connections, distances = find_neighbours(sites1, sites2, 20000, site1_site2_condition=">")
+        kdtree_connections, kdtree_distances = find_neighbours(sites1, sites2, 20000, site1_site2_condition=">",
+                                                               method="kdtree")
+        self.assertSequenceEqual(connections, kdtree_connections)
+
+    def test_kdtree_orthodrome(self):
+        sites1 = random_sites(15, 2)
+        sites2 = random_sites(20, 3)
+
+        connections, distances = find_neighbours(sites1, sites2, 30000, small_angle_approximation=False)
+        kdtree_connections, kdtree_distances = find_neighbours(sites1, sites2, 30000, small_angle_approximation=False,
+                                                               method="kdtree")
+        self.assertSequenceEqual(connections, kdtree_connections)
+        for row, kdtree_row in zip(distances, kdtree_distances):
+            np.testing.assert_allclose(row, kdtree_row)
+
+    def test_temperature_conditions(self):
+        sites1 = random_sites(40, 10)
+        sites2 = random_sites(50, 11)
+
+        for conditions in ((">", "true", ">"), (">=", "<=", "!="), ("true", "=", "<"), ("false", "true", "true")):
+            connections, distances = find_neighbours(sites1, sites2, 20000, 150, *conditions)
+            kdtree_connections, kdtree_distances = find_neighbours(sites1, sites2, 20000, 150, *conditions,
+                                                                   method="kdtree")
+            self.assertSequenceEqual(connections, kdtree_connections)
+            for i, neighbours in enumerate(connections):
+                for j in neighbours:
+                    temp1 = sites1["Temperature"][i]
+                    temp2 = sites2["Temperature"][j]
+                    self.assertTrue(temp_check(temp1, 150, conditions[0]) and temp_check(temp2, 150, conditions[1])
+                                    and temp_check(temp1, temp2, conditions[2]))
+
+    def test_symmetric(self):
+        sites = random_sites(70, 12)
+
+        for condition in ("true", ">", "="):
+            connections, distances = find_neighbours(sites, sites, 20000, site1_site2_condition=condition)
+            # every pair connected in at least one direction, without self loops
+            expected_connections = [[j for j in range(i + 1, sites.shape[0]) if j in connections[i] or
+                                     i in connections[j]] for i in range(sites.shape[0])]
+
+            for method in ("loop", "kdtree", "grid"):
+                symmetric_connections, symmetric_distances = \
+                    find_neighbours_symmetric(sites, 20000, site_site_condition=condition, method=method)
+                self.assertSequenceEqual(expected_connections, symmetric_connections)
+                for i, j, dist in ((i, j, dist) for i in range(sites.shape[0])
+                                   for j, dist in zip(symmetric_connections[i], symmetric_distances[i])):
+                    if j in connections[i]:
+                        self.assertAlmostEqual(distances[i][connections[i].index(j)], dist, 6)
+                    else:
+                        self.assertAlmostEqual(distances[j][connections[j].index(i)], dist, 6)
+
+    def test_grid(self):
+        sites1 = random_sites(60, 6)
+        sites2 = random_sites(80, 7)
+
+        for small_angle_approximation, max_distance in ((True, 20000), (False, 30000), (True, 100)):
+            connections, distances = find_neighbours(sites1, sites2, max_distance, site1_site2_condition=">=",
+                                                     small_angle_approximation=small_angle_approximation)
+            grid_connections, grid_distances = find_neighbours(sites1, sites2, max_distance,
+                                                               site1_site2_condition=">=",
+                                                               small_angle_approximation=small_angle_approximation,
+                                                               method="grid")
+            self.assertSequenceEqual(connections, grid_connections)
+            for row, grid_row in zip(distances, grid_distances):
+                np.testing.assert_allclose(row, grid_row)
+
+        self.assertSequenceEqual(([[]] * 5, [[]] * 5), find_neighbours(sites1.iloc[:5], sites2.iloc[:0], 20000,
+                                                                       method="grid"))
+        self.assertSequenceEqual(([], []), find_neighbours_symmetric(sites1.iloc[:0], 20000, method="grid"))
+
+    def test_sparse_output(self):
+        sites1 = random_sites(40, 8)
+        sites2 = random_sites(50, 9)
+
+        connections, distances = find_neighbours(sites1, sites2, 20000)
+        sparse = find_neighbours(sites1, sites2, 20000, output="sparse")
+        self.assertEqual((40, 50), sparse.shape)
+        self.assertEqual(np.int32, sparse.indices.dtype)
+        self.assertEqual(np.float32, sparse.data.dtype)
+        for i, (neighbours, neighbour_distances) in enumerate(zip(connections, distances)):
+            row = slice(sparse.indptr[i], sparse.indptr[i + 1])
+            self.assertSequenceEqual(neighbours, sparse.indices[row].tolist())
+            np.testing.assert_allclose(neighbour_distances, sparse.data[row], rtol=1e-6)
+
+        connections, distances = find_neighbours_symmetric(sites1, 20000, method="grid")
+        sparse = find_neighbours_symmetric(sites1, 20000, method="grid", output="sparse")
+        self.assertEqual((40, 40), sparse.shape)
+        self.assertSequenceEqual(connections, [sparse.indices[sparse.indptr[i]:sparse.indptr[i + 1]].tolist()
+                                               for i in range(40)])
+        self.assertEqual(0, find_neighbours(sites1, sites2.iloc[:0], 20000, output="sparse").nnz)
+
+        with self.assertRaises(ValueError):
+            find_neighbours(sites1, sites2, 20000, output="dict")
+
+    def test_processes(self):
+        sites1 = random_sites(50, 13)
+        sites2 = random_sites(60, 14)
+
+        for method in ("loop", "kdtree", "grid"):
+            connections, distances = find_neighbours(sites1, sites2, 20000, site1_condition=">",
+                                                     site1_site2_condition=">=", method=method)
+            parallel_connections, parallel_distances = find_neighbours(sites1, sites2, 20000, site1_condition=">",
+                                                                       site1_site2_condition=">=", method=method,
+                                                                       processes=2)
+            self.assertSequenceEqual(connections, parallel_connections)
+            self.assertSequenceEqual(distances, parallel_distances)
+
+            connections, distances = find_neighbours_symmetric(sites1, 20000, site_condition=">",
+                                                               site_site_condition=">=", method=method)
+            parallel_connections, parallel_distances = find_neighbours_symmetric(sites1, 20000, site_condition=">",
+                                                                                 site_site_condition=">=",
+                                                                                 method=method, processes=2)
+            self.assertSequenceEqual(connections, parallel_connections)
+            self.assertSequenceEqual(distances, parallel_distances)
+
+    def test_projected(self):
+        sites1 = random_sites(50, 15)
+        sites2 = random_sites(60, 16)
+        # planar coordinates in m
+        for sites in (sites1, sites2):
+            sites["X"] = sites["Lon"] * 70000
+            sites["Y"] = sites["Lat"] * 110000
+        expected = np.hypot(sites1["X"].values[:, None] - sites2["X"].values[None, :],
+                            sites1["Y"].values[:, None] - sites2["Y"].values[None, :])
+
+        for method in ("loop", "kdtree", "grid"):
+            connections, distances = find_neighbours(sites1, sites2, 20000, method=method, projected=True)
+            self.assertSequenceEqual([np.flatnonzero(row <= 20000).tolist() for row in expected], connections)
+            for i, (neighbours, neighbour_distances) in enumerate(zip(connections, distances)):
+                np.testing.assert_allclose(expected[i, neighbours], neighbour_distances)
+
+            symmetric_connections, _ = find_neighbours_symmetric(sites1, 20000, method=method, projected=True)
+            connections, _ = find_neighbours(sites1, sites1, 20000, projected=True)
+            self.assertSequenceEqual([[j for j in row if j > i] for i, row in enumerate(connections)],
+                                     symmetric_connections)
+
+    def test_kdtree_empty(self):
+        sites1 = random_sites(5, 4)
+        sites2 = random_sites(0, 5)
+
+        self.assertSequenceEqual(([[]] * 5, [[]] * 5), find_neighbours(sites1, sites2, 20000, method="kdtree"))
+        self.assertSequenceEqual(([], []), find_neighbours(sites2, sites1, 20000, method="kdtree"))
+        self.assertSequenceEqual(([], []), find_neighbours_symmetric(sites2, 20000, method="kdtree"))
+        self.assertSequenceEqual(([[]], [[]]), find_neighbours_symmetric(sites1.iloc[:1], 20000, method="kdtree"))
+
+
+class TestTemperature(unittest.TestCase):
+
+    def test_temp_mask(self):
+        temperatures1 = np.array([100, 150, 350])
+        temperatures2 = np.array([150, 150, 100, 500])
+        for condition in (">", ">=", "=", "<", "<=", "!=", "true", "false"):
+            mask = temp_mask(temperatures1[:, np.newaxis], temperatures2[np.newaxis, :], condition)
+            self.assertEqual((3, 4), mask.shape)
+            for i, temp1 in enumerate(temperatures1):
+                for j, temp2 in enumerate(temperatures2):
+                    self.assertEqual(bool(temp_check(temp1, temp2, condition)), mask[i, j])
+
+
+class TestDistance(unittest.TestCase):
+
+    def test_vincenty_distance(self):
+        coordinates1 = random_sites(10, 6)[["Lon", "Lat"]].values
+        coordinates2 = np.array(random_sites(10, 7)[["Lon", "Lat"]].values)
+        coordinates2[0] = coordinates1[0]
+
+        distances = vincenty_distance((coordinates1[:, 0], coordinates1[:, 1]), (coordinates2[:, 0],
+                                                                                 coordinates2[:, 1]))
+        for coordinate1, coordinate2, dist in zip(coordinates1, coordinates2, distances):
+            self.assertAlmostEqual(orthodrome_distance(tuple(coordinate1), tuple(coordinate2)), dist, 3)
+        self.assertEqual(0, distances[0])
+
+    def test_haversine_distance(self):
+        # one degree on the equator
+        self.assertAlmostEqual(6371008.8 * 2 * np.pi / 360, haversine_distance((0, 0), (1, 0)), 6)
+        self.assertAlmostEqual(6371008.8 * 2 * np.pi / 360, haversine_distance((5, 10), (5, 11)), 6)
+
+    def test_distance_matrix(self):
+        coordinates1 = random_sites(4, 8)[["Lon", "Lat"]].values
+        coordinates2 = random_sites(3, 9)[["Lon", "Lat"]].values
+
+        for small_angle_approximation, ellipsoid in ((True, "WGS-84"), (False, "WGS-84"), (False, None)):
+            matrix = distance_matrix(coordinates1, coordinates2, small_angle_approximation, ellipsoid)
+            self.assertEqual((4, 3), matrix.shape)
+        matrix = distance_matrix(coordinates1, coordinates2, False)
+        self.assertAlmostEqual(orthodrome_distance(tuple(coordinates1[3]), tuple(coordinates2[1])), matrix[3, 1], 3)
@@ -1,6 +1,13 @@
 import operator
-from geopy.distance import distance
+from multiprocessing import Pool
+from multiprocessing.sharedctypes import RawArray
+from geopy.distance import distance, ELLIPSOIDS
 import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.spatial import cKDTree
+
+TEMPERATURE_OPERATORS = {">": operator.gt, ">=": operator.ge, "=": operator.eq, "<": operator.lt, "<=": operator.le,
+                         "!=": operator.ne}
 
 
 def temp_check(temp_source, temp_sink, condition):
@@ -17,11 +24,8 @@ def temp_check(temp_source, temp_sink, condition):
     :return: returns true, if source can provide heat for sink.
     :rtype: bool.
     """
-    operators = {">": operator.gt, ">=": operator.ge, "=": operator.eq, "<": operator.lt, "<=": operator.le,
-                 "!=": operator.ne}
-
-    if condition in operators.keys():
-        if operators[condition](temp_source, temp_sink):
+    if condition in TEMPERATURE_OPERATORS:
+        if TEMPERATURE_OPERATORS[condition](temp_source, temp_sink):
             return True
     elif condition == "true":
         return True
@@ -29,6 +33,29 @@ def temp_check(temp_source, temp_sink, condition):
         return False
 
 
+def temp_mask(temp_source, temp_sink, condition):
+    """
+    vectorized version of temp_check(). The temperatures may be numpy arrays, which are broadcast against each other.
+
+    :param temp_source: temperatures of the heat sources.
+    :type temp_source: float or numpy array.
+    :param temp_sink: temperatures of the heat sinks.
+    :type temp_sink: float or numpy array.
+    :param condition: determines condition the temperature check uses.
+    :type condition: str of following list [">", ">=", "=", "<", "<=", "!=", "true", "false"].
+
+    :return: true where the source can provide heat for the sink.
+    :rtype: numpy array of bool.
+    """
+    shape = np.broadcast(temp_source, temp_sink).shape
+    if condition in TEMPERATURE_OPERATORS:
+        return np.broadcast_to(TEMPERATURE_OPERATORS[condition](np.asarray(temp_source), np.asarray(temp_sink)), shape)
+    elif condition == "true":
+        return np.ones(shape, dtype=bool)
+    else:
+        return np.zeros(shape, dtype=bool)
+
+
 def orthodrome_distance(coordinate_1, coordinate_2, ellipsoid="WGS-84"):
     """
     function computing the geodesic distance of two points on an ellipsoid (aka orthodrome).
@@ -44,7 +71,147 @@ def orthodrome_distance(coordinate_1, coordinate_2, ellipsoid="WGS-84"):
     :rtype: float.
     """
 
-    return distance(coordinate_1, coordinate_2, ellipsoid=ellipsoid).m
+    # geopy expects (latitude, longitude)
+    return distance(coordinate_1[::-1], coordinate_2[::-1], ellipsoid=ellipsoid).m
+
+
+def haversine_distance(coordinate_1, coordinate_2, radius=6371008.8):
+    """
+    function computing the great circle distance of points on a sphere. The coordinates may be numpy arrays, which are
+    broadcast against each other. Hence arrays of shape (n, 1) and (1, m) result in a distance matrix and arrays of
+    shape (n,) in the distances of n pairs.
+
+    :param coordinate_1: (longitude, latitude) of first locations in degree.
+    :type coordinate_1: tuple(float, float) or tuple(numpy array, numpy array).
+    :param coordinate_2: (longitude, latitude) of second locations in degree.
+    :type coordinate_2: tuple(float, float) or tuple(numpy array, numpy array).
+    :param radius: radius of the sphere in m. The default is the mean earth radius.
+    :type radius: float.
+
+    :return: great circle distance in m.
+    :rtype: float or numpy array.
+    """
+    lon1, lat1 = np.radians(coordinate_1[0]), np.radians(coordinate_1[1])
+    lon2, lat2 = np.radians(coordinate_2[0]), np.radians(coordinate_2[1])
+    h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * radius * np.arcsin(np.sqrt(np.minimum(h, 1)))
+
+
+def vincenty_distance(coordinate_1, coordinate_2, ellipsoid="WGS-84", iterations=20, tolerance=1e-12):
+    """
+    function computing the geodesic distance of points on an ellipsoid with the inverse formula of Vincenty. The
+    coordinates may be numpy arrays, which are broadcast against each other like in haversine_distance(). For points
+    which are not nearly antipodal the result agrees with orthodrome_distance() to well below a millimeter.
+
+    :param coordinate_1: (longitude, latitude) of first locations in degree.
+    :type coordinate_1: tuple(float, float) or tuple(numpy array, numpy array).
+    :param coordinate_2: (longitude, latitude) of second locations in degree.
+    :type coordinate_2: tuple(float, float) or tuple(numpy array, numpy array).
+    :param ellipsoid: optional ellipsoid model used for computation of distance.
+    :type ellipsoid: str {"WGS-84", "GRS_80", "Airy (1830)", "Intl 1924", "Clarke (1880)", "GRS-67"}.
+    :param iterations: maximum number of iterations. Nearly antipodal points which do not converge keep the value of
+                       the last iteration.
+    :type iterations: int.
+    :param tolerance: convergence threshold of the longitude on the auxiliary sphere in rad.
+    :type tolerance: float.
+
+    :return: orthodrome length in m.
+    :rtype: float or numpy array.
+    """
+    a, b, f = ELLIPSOIDS[ellipsoid]
+    a *= 1000
+    b *= 1000
+
+    lon1, lat1 = np.radians(coordinate_1[0]), np.radians(coordinate_1[1])
+    lon2, lat2 = np.radians(coordinate_2[0]), np.radians(coordinate_2[1])
+    difference_lon = lon2 - lon1
+    u1 = np.arctan((1 - f) * np.tan(lat1))
+    u2 = np.arctan((1 - f) * np.tan(lat2))
+    sin_u1, cos_u1 = np.sin(u1), np.cos(u1)
+    sin_u2, cos_u2 = np.sin(u2), np.cos(u2)
+
+    lambda_ = difference_lon
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for _ in range(iterations):
+            sin_lambda, cos_lambda = np.sin(lambda_), np.cos(lambda_)
+            sin_sigma = np.sqrt((cos_u2 * sin_lambda) ** 2 + (cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lambda) ** 2)
+            cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lambda
+            sigma = np.arctan2(sin_sigma, cos_sigma)
+            # coincident points have sin_sigma == 0
+            sin_alpha = np.where(sin_sigma == 0, 0, cos_u1 * cos_u2 * sin_lambda / sin_sigma)
+            cos_sq_alpha = 1 - sin_alpha ** 2
+            # points on the equator have cos_sq_alpha == 0
+            cos_2sigma_m = np.where(cos_sq_alpha == 0, 0, cos_sigma - 2 * sin_u1 * sin_u2 / cos_sq_alpha)
+            c = f / 16 * cos_sq_alpha * (4 + f * (4 - 3 * cos_sq_alpha))
+            last_lambda = lambda_
+            lambda_ = difference_lon + (1 - c) * f * sin_alpha * (
+                sigma + c * sin_sigma * (cos_2sigma_m + c * cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)))
+            if np.all(np.abs(lambda_ - last_lambda) < tolerance):
+                break
+
+    u_sq = cos_sq_alpha * (a ** 2 - b ** 2) / b ** 2
+    coefficient_a = 1 + u_sq / 16384 * (4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq)))
+    coefficient_b = u_sq / 1024 * (256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+    delta_sigma = coefficient_b * sin_sigma * (cos_2sigma_m + coefficient_b / 4 * (
+        cos_sigma * (-1 + 2 * cos_2sigma_m ** 2) - coefficient_b / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma ** 2) *
+        (-3 + 4 * cos_2sigma_m ** 2)))
+    return b * coefficient_a * (sigma - delta_sigma)
+
+
+def distance_matrix(coordinates1, coordinates2, small_angle_approximation=True, ellipsoid="WGS-84"):
+    """
+    function computing the distances of all pairs of sites 1 and sites 2.
+
+    :param coordinates1: (longitude, latitude) of sites 1.
+    :type coordinates1: numpy array of shape (n, 2).
+    :param coordinates2: (longitude, latitude) of sites 2.
+    :type coordinates2: numpy array of shape (m, 2).
+    :param small_angle_approximation: Determines if small angle approximation should be used for the distance
+                                      calculation.
+    :type small_angle_approximation: bool
+    :param ellipsoid: ellipsoid used if the small angle approximation is not used. If None, the earth is considered as
+                      a sphere and the haversine formula is used.
+    :type ellipsoid: str or None.
+
+    :return: distances in m.
+    :rtype: numpy array of shape (n, m).
+    """
+    coordinates1 = np.asarray(coordinates1, dtype=float)
+    coordinates2 = np.asarray(coordinates2, dtype=float)
+    return pair_distances((coordinates1[:, 0, np.newaxis], coordinates1[:, 1, np.newaxis]),
+                          (coordinates2[np.newaxis, :, 0], coordinates2[np.newaxis, :, 1]),
+                          small_angle_approximation, ellipsoid)
+
+
+def pair_distances(coordinate_1, coordinate_2, small_angle_approximation=True, ellipsoid="WGS-84", projected=False):
+    """
+    function computing the distances of pairs of points with the vectorized distance functions.
+
+    :param coordinate_1: (longitude, latitude) of first locations.
+    :type coordinate_1: tuple(numpy array, numpy array).
+    :param coordinate_2: (longitude, latitude) of second locations.
+    :type coordinate_2: tuple(numpy array, numpy array).
+    :param small_angle_approximation: Determines if small angle approximation should be used for the distance
+                                      calculation.
+    :type small_angle_approximation: bool
+    :param ellipsoid: ellipsoid used if the small angle approximation is not used. If None, the earth is considered as
+                      a sphere and the haversine formula is used.
+    :type ellipsoid: str or None.
+    :param projected: If True, the coordinates are (x, y) in m of a projected coordinate reference system and the
+                      euclidean distance is returned.
+    :type projected: bool
+
+    :return: distances in m.
+    :rtype: numpy array.
+    """
+    if projected:
+        return np.hypot(coordinate_2[0] - coordinate_1[0], coordinate_2[1] - coordinate_1[1])
+    elif small_angle_approximation:
+        return approximate_distance(coordinate_1, coordinate_2)
+    elif ellipsoid is None:
+        return haversine_distance(coordinate_1, coordinate_2)
+    else:
+        return vincenty_distance(coordinate_1, coordinate_2, ellipsoid=ellipsoid)
 
 
 def approximate_distance(coordinate_1, coordinate_2):
@@ -64,8 +231,373 @@ def approximate_distance(coordinate_1, coordinate_2):
         360 * 6378137 * 2 * np.pi
 
 
+def _unit_sphere_coordinates(latitude, longitude):
+    """
+    function converting geographic coordinates into cartesian coordinates on the unit sphere.
+
+    :param latitude: latitudes in degree.
+    :type latitude: numpy array.
+    :param longitude: longitudes in degree.
+    :type longitude: numpy array.
+
+    :return: cartesian coordinates.
+    :rtype: numpy array of shape (n, 3).
+    """
+    latitude = np.radians(latitude)
+    longitude = np.radians(longitude)
+    return np.column_stack((np.cos(latitude) * np.cos(longitude), np.cos(latitude) * np.sin(longitude),
+                            np.sin(latitude)))
+
+
+def _search_points(coordinates, max_distance, small_angle_approximation, projected=False):
+    """
+    function transforming coordinates into points of a euclidean space and the search radius into a radius in that
+    space, such that all points within max_distance are within the radius.
+
+    :param coordinates: (longitude, latitude) of sites.
+    :type coordinates: numpy array of shape (n, 2).
+    :param max_distance: Maximum distance in m for the fixed radius search.
+    :type max_distance: float
+    :param small_angle_approximation: Determines if the points are computed for the small angle approximation or the
+                                      orthodrome distance.
+    :type small_angle_approximation: bool
+    :param projected: If True, the coordinates are already points in m of a projected coordinate reference system.
+    :type projected: bool
+
+    :return: points and radius.
+    :rtype: tuple. (numpy array, float)
+    """
+    if projected:
+        points = coordinates
+        radius = max_distance
+    elif small_angle_approximation:
+        # approximate_distance is the euclidean distance of the coordinates scaled to meters
+        points = coordinates * (6378137 * 2 * np.pi / 360)
+        radius = max_distance
+    else:
+        # the angle is estimated with the smallest radius of curvature of the WGS-84 ellipsoid and an additional
+        # margin of 1%
+        points = _unit_sphere_coordinates(coordinates[:, 1], coordinates[:, 0])
+        angle = min(max_distance / 6335439 * 1.01, np.pi)
+        radius = 2 * np.sin(angle / 2)
+
+    # small margin so that rounding in the tree does not drop pairs exactly on the search radius
+    return points, radius * (1 + 1e-9)
+
+
+def kdtree_candidates(coordinates1, coordinates2, max_distance, small_angle_approximation=True, projected=False):
+    """
+    function searching with a k-d tree for all sites 2 which may be within the search radius of a site 1. The result is
+    a superset of the actual neighbours, hence the distance of the candidates still needs to be checked.
+
+    :param coordinates1: (longitude, latitude) of sites 1.
+    :type coordinates1: numpy array of shape (n, 2).
+    :param coordinates2: (longitude, latitude) of sites 2.
+    :type coordinates2: numpy array of shape (m, 2).
+    :param max_distance: Maximum distance in m for the fixed radius search.
+    :type max_distance: float
+    :param small_angle_approximation: Determines if the candidates are searched for the small angle approximation or
+                                      the orthodrome distance.
+    :type small_angle_approximation: bool
+    :param projected: If True, the coordinates are (x, y) in m of a projected coordinate reference system.
+    :type projected: bool
+
+    :return: sorted indices of candidates in sites 2 for every site 1.
+    :rtype: list. [[site2, site2, ...], [], ...]
+    """
+    if coordinates1.shape[0] == 0 or coordinates2.shape[0] == 0:
+        return [[] for _ in range(coordinates1.shape[0])]
+
+    points1, radius = _search_points(coordinates1, max_distance, small_angle_approximation, projected)
+    points2, _ = _search_points(coordinates2, max_distance, small_angle_approximation, projected)
+    tree = cKDTree(points2)
+    return [sorted(candidates) for candidates in tree.query_ball_point(points1, radius)]
+
+
+def kdtree_pair_candidates(coordinates, max_distance, small_angle_approximation=True, projected=False):
+    """
+    function searching with a k-d tree for all pairs of sites which may be within the search radius. Every pair is
+    only returned once, hence site i only lists candidates j > i. The result is a superset of the actual neighbours,
+    hence the distance of the candidates still needs to be checked.
+
+    :param coordinates: (longitude, latitude) of sites.
+    :type coordinates: numpy array of shape (n, 2).
+    :param max_distance: Maximum distance in m for the fixed radius search.
+    :type max_distance: float
+    :param small_angle_approximation: Determines if the candidates are searched for the small angle approximation or
+                                      the orthodrome distance.
+    :type small_angle_approximation: bool
+    :param projected: If True, the coordinates are (x, y) in m of a projected coordinate reference system.
+    :type projected: bool
+
+    :return: sorted indices of candidates j > i for every site i.
+    :rtype: list. [[site, site, ...], [], ...]
+    """
+    if coordinates.shape[0] == 0:
+        return []
+
+    points, radius = _search_points(coordinates, max_distance, small_angle_approximation, projected)
+    pairs = np.array(sorted(cKDTree(points).query_pairs(radius)), dtype=int).reshape(-1, 2)
+    return np.split(pairs[:, 1], np.searchsorted(pairs[:, 0], np.arange(1, coordinates.shape[0])))
+
+
+def _grid_cells(points, cell_size):
+    """
+    function hashing points into the cells of a regular grid.
+
+    :param points: points in a euclidean space.
+    :type points: numpy array of shape (n, d).
+    :param cell_size: edge length of the cells.
+    :type cell_size: float
+
+    :return: cell of every point and a dictionary mapping every occupied cell to the sorted indices of its points.
+    :rtype: tuple. (numpy array of shape (n, d), dict {cell: numpy array})
+    """
+    cells = np.floor(points / cell_size).astype(np.int64)
+    order = np.lexsort(cells.T[::-1])
+    sorted_cells = cells[order]
+    # positions in the sorted points where a new cell starts
+    starts = np.flatnonzero(np.any(sorted_cells[1:] != sorted_cells[:-1], axis=1)) + 1
+    buckets = {}
+    for indices in np.split(order, starts):
+        if indices.shape[0] > 0:
+            buckets[tuple(cells[indices[0]])] = np.sort(indices)
+    return cells, buckets
+
+
+def _neighbouring_cells(buckets, cell, offsets):
+    """
+    function returning the sorted indices of all points in a cell and its neighbouring cells.
+    """
+    indices = [buckets[neighbour] for neighbour in (tuple(np.add(cell, offset)) for offset in offsets)
+               if neighbour in buckets]
+    if len(indices) == 0:
+        return np.zeros(0, dtype=int)
+    return np.sort(np.concatenate(indices))
+
+
+def grid_candidates(coordinates1, coordinates2, max_distance, small_angle_approximation=True, symmetric=False,
+                    projected=False):
+    """
+    generator searching with a spatial hash for all sites 2 which may be within the search radius of a site 1. The
+    sites are hashed into grid cells with an edge length of the search radius, hence only sites in the same or a
+    neighbouring cell are candidates. The candidates are generated cell by cell, so only the candidates of one cell
+    are held in memory. The result is a superset of the actual neighbours, hence the distance of the candidates still
+    needs to be checked.
+
+    :param coordinates1: (longitude, latitude) of sites 1.
+    :type coordinates1: numpy array of shape (n, 2).
+    :param coordinates2: (longitude, latitude) of sites 2. Ignored if symmetric is True.
+    :type coordinates2: numpy array of shape (m, 2).
+    :param max_distance: Maximum distance in m for the fixed radius search.
+    :type max_distance: float
+    :param small_angle_approximation: Determines if the candidates are searched for the small angle approximation or
+                                      the orthodrome distance.
+    :type small_angle_approximation: bool
+    :param symmetric: If True, the sites 1 are searched among themselves and site i only gets candidates j > i.
+    :type symmetric: bool
+    :param projected: If True, the coordinates are (x, y) in m of a projected coordinate reference system.
+    :type projected: bool
+
+    :return: generator of site 1 indices and the sorted indices of their candidates.
+    :rtype: generator of tuples. (int, numpy array)
+    """
+    if symmetric:
+        coordinates2 = coordinates1
+    if coordinates1.shape[0] == 0 or coordinates2.shape[0] == 0:
+        return
+
+    points1, radius = _search_points(coordinates1, max_distance, small_angle_approximation, projected)
+    points2, _ = _search_points(coordinates2, max_distance, small_angle_approximation, projected)
+    cells1, buckets1 = _grid_cells(points1, radius)
+    _, buckets2 = _grid_cells(points2, radius)
+    offsets = np.array(np.meshgrid(*[[-1, 0, 1]] * points1.shape[1])).reshape(points1.shape[1], -1).T
+
+    for cell, sites1 in buckets1.items():
+        candidates = _neighbouring_cells(buckets2, cell, offsets)
+        for site1 in sites1:
+            if symmetric:
+                yield site1, candidates[np.searchsorted(candidates, site1, side="right"):]
+            else:
+                yield site1, candidates
+
+
+def _candidates(method, valid1, valid2, coordinates1, coordinates2, max_distance, small_angle_approximation,
+                projected):
+    """
+    function generating the candidates of every valid site 1 with the given method. See find_neighbours().
+
+    :return: generator of site 1 indices and the sorted indices of their candidates in sites 2.
+    :rtype: generator of tuples. (int, numpy array)
+    """
+    if method == "loop":
+        return ((site1, valid2) for site1 in valid1)
+    elif method == "kdtree":
+        candidates = kdtree_candidates(coordinates1[valid1], coordinates2[valid2], max_distance,
+                                       small_angle_approximation, projected)
+        return ((site1, valid2[site1_candidates]) for site1, site1_candidates in zip(valid1, candidates))
+    elif method == "grid":
+        return ((valid1[site1], valid2[site1_candidates]) for site1, site1_candidates in
+                grid_candidates(coordinates1[valid1], coordinates2[valid2], max_distance, small_angle_approximation,
+                                projected=projected))
+    else:
+        raise ValueError("unknown method " + str(method))
+
+
+def _neighbours_of_candidates(number_of_sites1, candidates, coordinates1, coordinates2, temperatures1, temperatures2,
+                              max_distance, site1_site2_condition, small_angle_approximation, ellipsoid,
+                              symmetric=False, projected=False):
+    """
+    function checking the distance and site1_site2_condition of the candidates of every site 1.
+
+    :param candidates: iterable of site 1 indices and the sorted indices of their candidates in sites 2.
+    :type candidates: iterable of tuples. (int, array like)
+
+    :return: Neighbours and distances of every site 1.
+    :rtype: tuple of lists of numpy arrays. Both lists have the same shape.
+    """
+    empty = np.zeros(0, dtype=int)
+    connections = [empty] * number_of_sites1
+    distances = [empty] * number_of_sites1
+    for site1, site1_candidates in candidates:
+        site1_candidates = np.asarray(site1_candidates, dtype=int)
+        # check if source and sink are close enough
+        site1_distances = pair_distances(coordinates1[site1], (coordinates2[site1_candidates, 0],
+                                                               coordinates2[site1_candidates, 1]),
+                                         small_angle_approximation, ellipsoid, projected)
+        temperature_condition = temp_mask(temperatures1[site1], temperatures2[site1_candidates],
+                                          site1_site2_condition)
+        if symmetric:
+            temperature_condition = temperature_condition | temp_mask(temperatures2[site1_candidates],
+                                                                      temperatures1[site1], site1_site2_condition)
+        neighbours = (site1_distances <= max_distance) & temperature_condition
+        connections[site1] = site1_candidates[neighbours]
+        distances[site1] = site1_distances[neighbours]
+
+    return connections, distances
+
+
+def _neighbours_output(connections, distances, number_of_sites2, output):
+    """
+    function converting the neighbours of every site 1 given as numpy arrays to the requested output.
+    """
+    if output == "sparse":
+        return neighbours_to_sparse(connections, distances, number_of_sites2)
+    return [row.tolist() for row in connections], [row.tolist() for row in distances]
+
+
+def neighbours_to_sparse(connections, distances, number_of_sites2):
+    """
+    function converting an adjacency list and its distances to a sparse matrix in compressed sparse row format.
+    Entry (i, j) is the distance between site 1 i and site 2 j. Explicitly stored entries are the connections, hence
+    sites at the same location are connected by an explicitly stored zero.
+
+    :param connections: Adjacency list.
+    :type connections: list. [[site2, site4], [], ...]
+    :param distances: Distances of the connections. Same shape as connections.
+    :type distances: list. [[distance1, distance2], [], ...]
+    :param number_of_sites2: Number of sites 2, hence the number of columns.
+    :type number_of_sites2: int
+
+    :return: Sparse distance matrix with int32 indices and float32 distances.
+    :rtype: scipy csr_matrix of shape (len(connections), number_of_sites2)
+    """
+    indptr = np.zeros(len(connections) + 1, dtype=np.int32)
+    np.cumsum([len(row) for row in connections], out=indptr[1:])
+    if indptr[-1] > 0:
+        indices = np.concatenate(connections).astype(np.int32)
+        data = np.concatenate(distances).astype(np.float32)
+    else:
+        indices = np.zeros(0, dtype=np.int32)
+        data = np.zeros(0, dtype=np.float32)
+    return csr_matrix((data, indices, indptr), shape=(len(connections), number_of_sites2))
+
+
+# sites 2 and search parameters shared with the worker processes of the parallel neighbour search
+_worker_sites2 = {}
+
+
+def _init_neighbour_worker(coordinates2, temperatures2, valid2, parameters):
+    """
+    function initializing a worker process of the parallel neighbour search. The arrays of sites 2 are shared memory
+    and are only wrapped by numpy arrays, hence they are not copied.
+    """
+    _worker_sites2["coordinates"] = np.frombuffer(coordinates2, dtype=np.float64).reshape(-1, 2)
+    _worker_sites2["temperatures"] = np.frombuffer(temperatures2, dtype=np.float64)
+    _worker_sites2["valid"] = np.frombuffer(valid2, dtype=np.int64)
+    _worker_sites2["parameters"] = parameters
+
+
+def _neighbours_of_chunk(chunk):
+    """
+    function searching the neighbours of a chunk of valid sites 1 in the sites 2 of the worker process.
+
+    :param chunk: (longitude, latitude), temperature and index of the sites 1 of the chunk. The index is only used by
+                  the symmetric search, which only keeps candidates with a larger index.
+    :type chunk: tuple. (numpy array of shape (n, 2), numpy array of shape (n,), numpy array of shape (n,))
+
+    :return: Neighbours and distances of every site 1 of the chunk.
+    :rtype: tuple of lists of numpy arrays.
+    """
+    coordinates1, temperatures1, indices1 = chunk
+    coordinates2 = _worker_sites2["coordinates"]
+    temperatures2 = _worker_sites2["temperatures"]
+    max_distance, site1_site2_condition, small_angle_approximation, method, ellipsoid, projected, symmetric = \
+        _worker_sites2["parameters"]
+    valid1 = np.arange(coordinates1.shape[0])
+    candidates = _candidates(method, valid1, _worker_sites2["valid"], coordinates1, coordinates2, max_distance,
+                             small_angle_approximation, projected)
+    if symmetric:
+        # every pair is evaluated once by the site with the smaller index, hence no site is its own neighbour
+        candidates = ((site1, site1_candidates[np.searchsorted(site1_candidates, indices1[site1], side="right"):])
+                      for site1, site1_candidates in candidates)
+    return _neighbours_of_candidates(coordinates1.shape[0], candidates, coordinates1, coordinates2, temperatures1,
+                                     temperatures2, max_distance, site1_site2_condition, small_angle_approximation,
+                                     ellipsoid, symmetric=symmetric, projected=projected)
+
+
+def _shared_array(array, typecode):
+    """
+    function copying a numpy array into shared memory.
+    """
+    shared = RawArray(typecode, array.size)
+    np.frombuffer(shared, dtype=array.dtype)[:] = array.ravel()
+    return shared
+
+
+def _parallel_neighbours(number_of_sites1, valid1, valid2, coordinates1, coordinates2, temperatures1, temperatures2,
+                         parameters, processes):
+    """
+    function searching the neighbours of the valid sites 1 in chunks on a pool of worker processes. The sites 2 are
+    shared memory of all workers, only the chunks of sites 1 and the results are transferred.
+
+    :return: Neighbours and distances of every site 1.
+    :rtype: tuple of lists of numpy arrays.
+    """
+    shared = (_shared_array(coordinates2, "d"), _shared_array(temperatures2, "d"),
+              _shared_array(valid2.astype(np.int64), "q"))
+    # a few chunks per process balance the load of dense and sparse regions
+    chunks = [chunk for chunk in np.array_split(valid1, processes * 4) if chunk.shape[0] > 0]
+    pool = Pool(processes, initializer=_init_neighbour_worker, initargs=shared + (parameters,))
+    try:
+        results = pool.map(_neighbours_of_chunk, [(coordinates1[chunk], temperatures1[chunk], chunk)
+                                                  for chunk in chunks])
+    finally:
+        pool.close()
+        pool.join()
+    empty = np.zeros(0, dtype=int)
+    connections = [empty] * number_of_sites1
+    distances = [empty] * number_of_sites1
+    for chunk, (chunk_connections, chunk_distances) in zip(chunks, results):
+        for site1, site1_connections, site1_distances in zip(chunk, chunk_connections, chunk_distances):
+            connections[site1] = site1_connections
+            distances[site1] = site1_distances
+    return connections, distances
+
+
 def find_neighbours(sites1, sites2, max_distance, network_temp=100, site1_condition="true", site2_condition="true",
-                    site1_site2_condition="true", small_angle_approximation=True):
+                    site1_site2_condition="true", small_angle_approximation=True, method="loop",
+                    ellipsoid="WGS-84", output="list", processes=1, projected=False):
     """
     Function searching for neighbours in a fixed search radius. Only adds the next neighbour if all temperature
     conditions are met.
@@ -74,7 +606,7 @@ def find_neighbours(sites1, sites2, max_distance, network_temp=100, site1_condit
     :type sites1: pandas Dataframe
     :param sites2: Dataframe containing coordinates of sites 2.
     :type sites2: pandas Dataframe
-    :param max_distance: Maximum distance in km for the fixed radius search.
+    :param max_distance: Maximum distance in m for the fixed radius search.
     :type max_distance: float
     :param network_temp: Temperature of the network in °C. The site1_condition and site2_condition are in reference to
                          this network temperature.
@@ -88,40 +620,147 @@ def find_neighbours(sites1, sites2, max_distance, network_temp=100, site1_condit
     :param small_angle_approximation: Determines if small angle approximation should be used for the distance
                                       calculation.
     :type small_angle_approximation: bool
-    :return: Adjacency list and distances.
-    :rtype: tuple of Adjacency list and distances. Both lists have the same shape.
-    """
-    # get indices of columns
-    lon1_ind = sites1.columns.get_loc("Lon")
-    lat1_ind = sites1.columns.get_loc("Lat")
-    lon2_ind = sites2.columns.get_loc("Lon")
-    lat2_ind = sites2.columns.get_loc("Lat")
-    temp1_ind = sites1.columns.get_loc("Temperature")
-    temp2_ind = sites2.columns.get_loc("Temperature")
-
-    connections = []
-    distances = []
-    for site1 in sites1.values:
-        connections.append([])
-        distances.append([])
-        coordinate1 = (site1[lon1_ind], site1[lat1_ind])
-        temp1 = site1[temp1_ind]
-        for i, site2 in enumerate(sites2.values):
-            coordinate2 = (site2[lon2_ind], site2[lat2_ind])
-            temp2 = site2[temp2_ind]
-            # check if source and sink are close enough
-            if small_angle_approximation is False:
-                dist = orthodrome_distance(coordinate1, coordinate2)
-            else:
-                dist = approximate_distance(coordinate1, coordinate2)
-            if dist <= max_distance:
-                if temp_check(temp1, network_temp, site1_condition) and \
-                        temp_check(temp2, network_temp, site2_condition) and \
-                        temp_check(temp1, temp2, site1_site2_condition):
-                    connections[-1].append(i)
-                    distances[-1].append(dist)
+    :param method: Determines how the pairs of sites are searched. "loop" computes the distance of every pair of
+                   sites. "kdtree" builds a k-d tree of sites 2 and only computes the distance of pairs within the
+                   search radius, which is considerably faster for many sites. "grid" hashes the sites into grid
+                   cells of the size of the search radius and streams the candidates cell by cell, which keeps the
+                   memory linear in the number of sites. All methods return identical results.
+    :type method: str of following list ["loop", "kdtree", "grid"]
+    :param ellipsoid: Ellipsoid used if the small angle approximation is not used. If None, the earth is considered as
+                      a sphere and the haversine formula is used.
+    :type ellipsoid: str or None
+    :param output: Determines the return type. "list" returns an adjacency list and the distances. "sparse" returns
+                   a scipy csr_matrix of shape (number of sites 1, number of sites 2) whose entries are the distances
+                   of the connections, which avoids a python object per connection for many sites.
+    :type output: str of following list ["list", "sparse"]
+    :param processes: Number of worker processes. If greater than 1, sites 1 are split into chunks which are searched
+                      in parallel while the sites 2 are shared memory of all processes. The result is identical.
+    :type processes: int
+    :param projected: If True, the columns "X" and "Y" containing projected coordinates in m, e.g. EPSG:3035, are used
+                      instead of "Lon" and "Lat" and the distances are euclidean. The small_angle_approximation and
+                      ellipsoid are ignored.
+    :type projected: bool
+    :return: Adjacency list and distances or sparse distance matrix.
+    :rtype: tuple of Adjacency list and distances. Both lists have the same shape. Or scipy csr_matrix.
+    """
+    if output not in ("list", "sparse"):
+        raise ValueError("unknown output " + str(output))
+    coordinates1, temperatures1 = _coordinates_and_temperatures(sites1, projected)
+    coordinates2, temperatures2 = _coordinates_and_temperatures(sites2, projected)
+
+    # sites not meeting the condition in respect to the network temperature are excluded before any distance is computed
+    valid1 = np.flatnonzero(temp_mask(temperatures1, network_temp, site1_condition))
+    valid2 = np.flatnonzero(temp_mask(temperatures2, network_temp, site2_condition))
+    if method not in ("loop", "kdtree", "grid"):
+        raise ValueError("unknown method " + str(method))
+
+    if processes > 1 and valid1.shape[0] > 0:
+        parameters = (max_distance, site1_site2_condition, small_angle_approximation, method, ellipsoid, projected,
+                      False)
+        connections, distances = _parallel_neighbours(sites1.shape[0], valid1, valid2, coordinates1, coordinates2,
+                                                      temperatures1, temperatures2, parameters, processes)
+    else:
+        candidates = _candidates(method, valid1, valid2, coordinates1, coordinates2, max_distance,
+                                 small_angle_approximation, projected)
+        connections, distances = _neighbours_of_candidates(sites1.shape[0], candidates, coordinates1, coordinates2,
+                                                           temperatures1, temperatures2, max_distance,
+                                                           site1_site2_condition, small_angle_approximation,
+                                                           ellipsoid, projected=projected)
 
-    return connections, distances
+    return _neighbours_output(connections, distances, sites2.shape[0], output)
+
+
+def find_neighbours_symmetric(sites, max_distance, network_temp=100, site_condition="true",
+                              site_site_condition="true", small_angle_approximation=True, method="loop",
+                              ellipsoid="WGS-84", output="list", processes=1, projected=False):
+    """
+    Function searching for neighbours among the sites themselves in a fixed search radius. Unlike
+    find_neighbours(sites, sites, ...) every pair is only evaluated once and no site is its own neighbour, hence the
+    returned adjacency list is upper triangular. A pair is connected if the site_site_condition is fulfilled in
+    either direction, which are the same edges find_neighbours(sites, sites, ...) returns without the self loops and
+    duplicates.
+
+    :param sites: Dataframe containing coordinates of sites.
+    :type sites: pandas Dataframe
+    :param max_distance: Maximum distance in m for the fixed radius search.
+    :type max_distance: float
+    :param network_temp: Temperature of the network in °C. The site_condition is in reference to this network
+                         temperature.
+    :type network_temp: float
+    :param site_condition: Condition the site temp should fulfill in aspect to the network temp.
+    :type site_condition: str of following list [">", ">=", "=", "<", "<=", "!=", "true", "false"]
+    :param site_site_condition: Condition the temp of one site should fulfill in aspect to the temp of the other site.
+    :type site_site_condition: str of following list [">", ">=", "=", "<", "<=", "!=", "true", "false"]
+    :param small_angle_approximation: Determines if small angle approximation should be used for the distance
+                                      calculation.
+    :type small_angle_approximation: bool
+    :param method: Determines how the pairs of sites are searched. See find_neighbours().
+    :type method: str of following list ["loop", "kdtree", "grid"]
+    :param ellipsoid: Ellipsoid used if the small angle approximation is not used. If None, the earth is considered as
+                      a sphere and the haversine formula is used.
+    :type ellipsoid: str or None
+    :param output: Determines the return type. See find_neighbours().
+    :type output: str of following list ["list", "sparse"]
+    :param processes: Number of worker processes. See find_neighbours().
+    :type processes: int
+    :param projected: Determines if the projected coordinates are used. See find_neighbours().
+    :type projected: bool
+    :return: Adjacency list and distances or upper triangular sparse distance matrix. Site i only contains neighbours
+             j > i.
+    :rtype: tuple of Adjacency list and distances. Both lists have the same shape. Or scipy csr_matrix.
+    """
+    if output not in ("list", "sparse"):
+        raise ValueError("unknown output " + str(output))
+    coordinates, temperatures = _coordinates_and_temperatures(sites, projected)
+
+    valid = np.flatnonzero(temp_mask(temperatures, network_temp, site_condition))
+    if method not in ("loop", "kdtree", "grid"):
+        raise ValueError("unknown method " + str(method))
+
+    if processes > 1 and valid.shape[0] > 0:
+        parameters = (max_distance, site_site_condition, small_angle_approximation, method, ellipsoid, projected, True)
+        connections, distances = _parallel_neighbours(sites.shape[0], valid, valid, coordinates, coordinates,
+                                                      temperatures, temperatures, parameters, processes)
+        return _neighbours_output(connections, distances, sites.shape[0], output)
+
+    if method == "loop":
+        candidates = ((site, valid[valid > site]) for site in valid)
+    elif method == "kdtree":
+        candidates = kdtree_pair_candidates(coordinates[valid], max_distance, small_angle_approximation, projected)
+        candidates = ((site, valid[site_candidates]) for site, site_candidates in zip(valid, candidates))
+    elif method == "grid":
+        candidates = ((valid[site], valid[site_candidates]) for site, site_candidates in
+                      grid_candidates(coordinates[valid], None, max_distance, small_angle_approximation,
+                                      symmetric=True, projected=projected))
+    else:
+        raise ValueError("unknown method " + str(method))
+
+    connections, distances = _neighbours_of_candidates(sites.shape[0], candidates, coordinates, coordinates,
+                                                       temperatures, temperatures, max_distance, site_site_condition,
+                                                       small_angle_approximation, ellipsoid, symmetric=True,
+                                                       projected=projected)
+
+    return _neighbours_output(connections, distances, sites.shape[0], output)
+
+
+def _coordinates_and_temperatures(sites, projected=False):
+    """
+    function extracting the coordinates and temperatures of sites as numpy arrays.
+
+    :param sites: Dataframe containing the columns "Lon", "Lat" or "X", "Y" and "Temperature".
+    :type sites: pandas Dataframe
+    :param projected: Determines if the projected coordinates "X", "Y" are extracted.
+    :type projected: bool
+
+    :return: (longitude, latitude) or (x, y) and temperature of every site.
+    :rtype: tuple. (numpy array of shape (n, 2), numpy array of shape (n,))
+    """
+    if projected:
+        coordinates = sites[["X", "Y"]].values.astype(float)
+    else:
+        coordinates = sites[["Lon", "Lat"]].values.astype(float)
+    temperatures = sites["Temperature"].values.astype(float)
+    return coordinates, temperatures
 
 
 def annuity_costs(cost, discount_rate, years):
@@ -145,16 +784,6 @@ def moving_average(array, order):
     return np.convolve(array, [1] * order) / order
 
 
-def transpose4with1(array):
-    template = [[[[] for _ in subsub] for subsub in subarray] for subarray in array[0]]
-    for subarray in array:
-        for i, subsub in enumerate(subarray):
-            for j, subsubsub in enumerate(subsub):
-                for k, value in enumerate(subsubsub):
-                    template[i][j][k].append(value)
-    return template
-
-
 def create_normalized_profiles(profiles, region_header, time_header, value_header):
     """
     function normalizing profiles so that the sum of values over all time stamps of each region is 1